@@ -0,0 +1,286 @@
+import argparse
+import contextlib
+import os
+import re
+import socketserver
+import sys
+import time
+import tracemalloc
+import pandas as pd
+
+"""
+    GRADER DRIVER HELPERS:
+    Run the student questions once per process (the default), or keep the dataset
+    loaded and answer a stream of question commands from stdin or a local Unix socket.
+    A command is a question name ("Q1"), a list of names ("Q2,Q4,Q7") or "all".
+    With --mem, every answer also reports its peak traced allocation and the number
+    of deep DataFrame copies it made.
+"""
+
+QUESTION_PATTERN = re.compile(r"Q\d+")
+EXIT_COMMANDS = ("exit", "quit")
+
+
+def find_questions(module):
+    """
+    Collect the question functions of a module in question order.
+
+    Args:
+        module (module): Module that defines Q1, Q2, ... functions
+
+    Returns:
+        dict: Question name mapped to its function
+    """
+    names = [name for name in vars(module) if QUESTION_PATTERN.fullmatch(name)]
+    names.sort(key=lambda name: int(name[1:]))
+    return {name: getattr(module, name) for name in names}
+
+
+def enable_copy_on_write():
+    """
+    Turn on pandas copy-on-write so a shallow copy of the shared DataFrame
+    only copies the columns a question actually modifies.
+    (Copy-on-write is always enabled from pandas 3.0.)
+    """
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+def parse_command(command, questions):
+    """
+    Expand a command into the list of question names to answer.
+
+    Args:
+        command (string): "Q1", "Q2,Q4,Q7" or "all"
+        questions (dict): Available question functions
+
+    Returns:
+        list: Question names in the requested order
+    """
+    command = command.strip()
+    if command.lower() == "all":
+        return list(questions)
+
+    names = [name.strip() for name in command.split(",") if name.strip()]
+    unknown = [name for name in names if name not in questions]
+    if not names or unknown:
+        raise ValueError(f"Unknown question: {command!r}")
+    return names
+
+
+@contextlib.contextmanager
+def count_copies():
+    """
+    Count the deep DataFrame copies made inside the block
+    (shallow copy-on-write copies are free and not counted).
+
+    Yields:
+        dict: Counter, its "copies" entry is updated while the block runs
+    """
+    counter = {"copies": 0}
+    original_copy = pd.DataFrame.copy
+
+    def counting_copy(self, *args, **kwargs):
+        deep = kwargs.get("deep", args[0] if args else True)
+        if deep:
+            counter["copies"] += 1
+        return original_copy(self, *args, **kwargs)
+
+    pd.DataFrame.copy = counting_copy
+    try:
+        yield counter
+    finally:
+        pd.DataFrame.copy = original_copy
+
+
+def measure_memory(function):
+    """
+    Call a function while tracing its allocations and DataFrame copies.
+
+    Args:
+        function (callable): Function without arguments
+
+    Returns:
+        tuple: Function result and a dict with peak_bytes and copies
+    """
+    tracemalloc.start()
+    try:
+        with count_copies() as counter:
+            result = function()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, {"peak_bytes": peak_bytes, "copies": counter["copies"]}
+
+
+def answer_command(command, answer, questions, memory=False):
+    """
+    Answer every question of a command and measure the wall time of each answer.
+
+    Args:
+        command (string): "Q1", "Q2,Q4,Q7" or "all"
+        answer (callable): Function that maps a question name to its output line
+        questions (dict): Available question functions
+        memory (bool): Also measure peak allocations and DataFrame copies (slower)
+
+    Returns:
+        list: (question name, output line, elapsed seconds, memory usage or None)
+            of each question
+    """
+    results = []
+    for name in parse_command(command, questions):
+        usage = None
+        start = time.perf_counter()
+        if memory:
+            output, usage = measure_memory(lambda: answer(name))
+        else:
+            output = answer(name)
+        elapsed = time.perf_counter() - start
+        results.append((name, output, elapsed, usage))
+    return results
+
+
+def report_times(results):
+    """
+    Log per-question and total wall time (and memory usage when measured) to stderr.
+
+    Args:
+        results (list): (question name, output line, elapsed seconds, memory usage) tuples
+    """
+    for name, _, elapsed, usage in results:
+        line = f"[{name}] {elapsed:.4f}s"
+        if usage is not None:
+            line += (
+                f" peak {usage['peak_bytes'] / 2**20:.2f} MiB,"
+                f" {usage['copies']} DataFrame copies"
+            )
+        print(line, file=sys.stderr)
+    if len(results) > 1:
+        total = sum(elapsed for _, _, elapsed, _ in results)
+        print(f"[total] {total:.4f}s", file=sys.stderr)
+    sys.stderr.flush()
+
+
+def handle_stream(lines, write, answer, questions, memory=False):
+    """
+    Answer every command from a stream of lines until it ends or receives "exit".
+
+    Args:
+        lines (iterable): Incoming command lines
+        write (callable): Function that sends one output line back
+        answer (callable): Function that maps a question name to its output line
+        questions (dict): Available question functions
+        memory (bool): Also report peak allocations and DataFrame copies
+    """
+    for line in lines:
+        command = line.strip()
+        if not command:
+            continue
+        if command.lower() in EXIT_COMMANDS:
+            break
+
+        # Keep the stream in sync by answering errors with a single line too.
+        try:
+            results = answer_command(command, answer, questions, memory)
+        except Exception as error:
+            write(f"Error: {error}")
+            continue
+
+        for _, output, _, _ in results:
+            write(output)
+        report_times(results)
+
+
+def serve(answer, questions, socket_path=None, memory=False):
+    """
+    Answer question commands until the input ends.
+
+    Args:
+        answer (callable): Function that maps a question name to its output line
+        questions (dict): Available question functions
+        socket_path (string): Unix socket path, read from stdin when None
+        memory (bool): Also report peak allocations and DataFrame copies
+    """
+    if socket_path is None:
+
+        def write(output):
+            print(output, flush=True)
+
+        handle_stream(sys.stdin, write, answer, questions, memory)
+        return
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            def write(output):
+                self.wfile.write(f"{output}\n".encode())
+                self.wfile.flush()
+
+            lines = (raw.decode() for raw in self.rfile)
+            handle_stream(lines, write, answer, questions, memory)
+
+    # Remove a stale socket file left by a previous server.
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with socketserver.UnixStreamServer(socket_path, Handler) as server:
+        print(f"Serving on {socket_path}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def run(load, answer, questions, prompt=""):
+    """
+    Command line entry point shared by the grader main.py files.
+
+    Args:
+        load (callable): Function that loads the dataset once for a list of question names
+        answer (callable): Function that maps (data, question name) to its output line
+        questions (dict): Available question functions
+        prompt (string): Prompt shown when reading a single command from stdin
+    """
+    parser = argparse.ArgumentParser(description="Answer grader questions.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        help='question command such as "Q1", "Q2,Q4,Q7" or "all" (read from stdin if omitted)',
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="keep the dataset loaded and answer one command per line from stdin",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="serve commands on a local Unix socket instead of stdin",
+    )
+    parser.add_argument(
+        "--mem",
+        action="store_true",
+        help="report the peak traced allocation and DataFrame copies of each question",
+    )
+    args = parser.parse_args()
+    enable_copy_on_write()
+
+    # Server mode: load the dataset once, then answer every incoming command.
+    if args.serve or args.socket:
+        data = load(list(questions))
+        serve(lambda name: answer(data, name), questions, args.socket, args.mem)
+        return
+
+    # Default mode: answer a single command against one load of the dataset.
+    command = args.command if args.command is not None else input(prompt)
+    data = load(parse_command(command, questions))
+    results = answer_command(
+        command, lambda name: answer(data, name), questions, args.mem
+    )
+    for _, output, _, _ in results:
+        print(output)
+
+    # A plain single question prints only its answer, like the original driver.
+    if len(results) > 1 or args.mem:
+        report_times(results)
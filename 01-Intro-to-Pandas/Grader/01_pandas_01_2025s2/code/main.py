@@ -1,12 +1,21 @@
-import pandas as pd
+import dataset
+import grader
+import student
 from student import *
 
 
+def load(questions):
+    return dataset.load_csv("./scores.csv", schema="scores", questions=questions)
+
+
+def answer(df, question):
+    # Give each question a copy-on-write view, so one answer cannot affect the next
+    # and only the columns a question modifies are ever copied.
+    return f"{globals()[question](df.copy(deep=False))}"
+
+
 def main():
-    input_string = input().strip()
-    df = pd.read_csv("./scores.csv")
-    input_command = f"{input_string}(df)"
-    print(f"{eval(input_command)}")
+    grader.run(load, answer, grader.find_questions(student))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+import json
+import os
+import dataset
+
+"""
+    CATEGORY DIMENSION:
+    Parse category_id.json once per process and keep the id to name mapping,
+    keyed by the fingerprint of the file, so an edited file is parsed again.
+    Questions resolve category names to ids here and then filter the integer
+    category_id column, instead of adding a category name column to the videos.
+"""
+
+# Real path mapped to (file fingerprint, id to name mapping).
+CATEGORY_CACHE = {}
+
+
+def category_names(path):
+    """
+    Load the category id to category name mapping of a category file.
+
+    Args:
+        path (string): category_id.json path
+
+    Returns:
+        dict: Category id mapped to its name (shared, do not modify)
+    """
+    key = os.path.realpath(path)
+    file_fingerprint = dataset.fingerprint(path)
+
+    cached = CATEGORY_CACHE.get(key)
+    if cached is not None and cached[0] == file_fingerprint:
+        return cached[1]
+
+    with open(path) as file:
+        items = json.load(file)["items"]
+    names = {int(item["id"]): item["snippet"]["title"] for item in items}
+
+    CATEGORY_CACHE[key] = (file_fingerprint, names)
+    return names
+
+
+def category_ids(path, names):
+    """
+    Resolve category names to their category ids.
+
+    Args:
+        path (string): category_id.json path
+        names (list): Category names
+
+    Returns:
+        dict: Category id mapped to its name, for the ids of the given names only
+    """
+    return {
+        category_id: name
+        for category_id, name in category_names(path).items()
+        if name in names
+    }
@@ -0,0 +1,132 @@
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import dataset
+import main as driver
+import student
+
+"""
+    MULTI-COUNTRY TRENDING ANALYSIS:
+    Run the trending questions over a directory of country dumps
+    (<CC>videos.csv with <CC>_category_id.json, e.g. GBvideos.csv and GB_category_id.json).
+    Every country is answered in its own worker process, so the total runtime scales
+    with the pool size rather than with the number of countries. A worker releases the
+    shared handle of a dump once its country is answered, so it holds one dump at a time. The per-country answers
+    and timings are merged into one table.
+"""
+
+VIDEOS_SUFFIX = "videos.csv"
+CATEGORY_SUFFIX = "_category_id.json"
+DEFAULT_QUESTIONS = ["Q2", "Q3", "Q4", "Q5"]
+
+
+def find_countries(directory):
+    """
+    Find the country dumps of a directory.
+
+    Args:
+        directory (string): Directory of <CC>videos.csv and <CC>_category_id.json files
+
+    Returns:
+        dict: Country code mapped to its (videos path, category path)
+    """
+    countries = {}
+    for path in sorted(glob.glob(os.path.join(directory, f"*{VIDEOS_SUFFIX}"))):
+        country = os.path.basename(path)[: -len(VIDEOS_SUFFIX)]
+        countries[country] = (
+            path,
+            os.path.join(directory, f"{country}{CATEGORY_SUFFIX}"),
+        )
+    return countries
+
+
+def analyze_country(country, videos_path, category_path, questions):
+    """
+    Answer the questions of one country (runs inside a worker process).
+
+    Args:
+        country (string): Country code
+        videos_path (string): <CC>videos.csv path
+        category_path (string): <CC>_category_id.json path
+        questions (list): Question names
+
+    Returns:
+        dict: Country, answer of every question, load time and total time in seconds
+    """
+    start = time.perf_counter()
+    try:
+        vdo_df = driver.load(questions, path=videos_path)
+        result = {"country": country, "load_seconds": time.perf_counter() - start}
+
+        for question in questions:
+            function = getattr(student, question)
+            if question == "Q5":
+                result[question] = function(vdo_df.copy(deep=False), category_path)
+            else:
+                result[question] = function(vdo_df.copy(deep=False))
+    finally:
+        # A worker answers many countries, so it only keeps one dump at a time.
+        dataset.release(videos_path, schema="videos")
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def analyze(directory, questions=None, workers=None):
+    """
+    Answer the questions of every country of a directory with a process pool.
+
+    Args:
+        directory (string): Directory of the country dumps
+        questions (list): Question names, Q2 to Q5 when None
+        workers (int): Pool size, the number of CPUs when None
+
+    Returns:
+        DataFrame: One row per country (answers, load_seconds, seconds and error)
+    """
+    if questions is None:
+        questions = DEFAULT_QUESTIONS
+
+    countries = find_countries(directory)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(analyze_country, country, *paths, questions): country
+            for country, paths in countries.items()
+        }
+        for future in as_completed(futures):
+            # One broken dump does not stop the other countries.
+            try:
+                results.append({**future.result(), "error": None})
+            except Exception as exception:
+                error = f"{type(exception).__name__}: {exception}"
+                results.append({"country": futures[future], "error": error})
+
+    columns = ["country", *questions, "load_seconds", "seconds", "error"]
+    table = pd.DataFrame(results, columns=columns)
+    return table.sort_values("country").set_index("country")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trending analysis per country.")
+    parser.add_argument("directory", help="directory of <CC>videos.csv files")
+    parser.add_argument("--questions", nargs="+", default=DEFAULT_QUESTIONS)
+    parser.add_argument("--workers", type=int, default=None, help="pool size")
+    parser.add_argument("--output", default=None, help="optional CSV of the table")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = analyze(args.directory, args.questions, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(table.to_string())
+    print(f"{len(table)} countries in {elapsed:.2f}s")
+    if args.output is not None:
+        table.to_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+import argparse
+import os
+import shutil
+import urllib.parse
+import numpy as np
+import pandas as pd
+import categories
+import dataset
+import sketch
+import streaming
+
+"""
+    TRENDING ROLLUP CUBE:
+    A persisted rollup of the deduplicated videos keyed by (trending_date, category_id),
+    holding the row count, the total views, the total comments and the number of rows
+    with more comments than a threshold.
+    The cube is built once from videos.csv. Appending the trending file of a new day
+    only folds the new rows into it, and a row that was already counted is never
+    counted twice. Duplicate rows share their trending date, so the row hashes of the
+    counted rows are kept in a separate dedup index, one sorted array per trending
+    date (in a directory next to the cube). Appending a chunk only loads and probes
+    (np.searchsorted) the days of its rows, so the cost of an append does not grow
+    with the history of other days.
+    The cube file itself only holds the cells, so loading it to answer Q1, Q3, Q4 and
+    Q5 reads a few thousand cells and never the dedup index.
+"""
+
+CUBE_FILENAME = "trending_cube.npz"
+INDEX_SUFFIX = ".rows"
+KEY_COLUMNS = ["trending_date", "category_id"]
+VALUE_COLUMNS = ["count", "views", "comments", "comments_over"]
+CHUNK_SIZE = streaming.CHUNK_SIZE
+
+
+def index_path(path):
+    """
+    Locate the dedup index directory of a cube file.
+
+    Args:
+        path (string): Cube file path
+
+    Returns:
+        string: Directory of the per-day row hash files
+    """
+    return f"{path}{INDEX_SUFFIX}"
+
+
+def day_index_path(index_dir, date):
+    """
+    Locate the row hash file of one trending date.
+
+    Args:
+        index_dir (string): Dedup index directory
+        date (string): Trending date
+
+    Returns:
+        string: .npy file path (the date is quoted into a safe file name)
+    """
+    return os.path.join(index_dir, f"{urllib.parse.quote(str(date), safe='')}.npy")
+
+
+def write_index(index_dir, row_hashes):
+    """
+    Replace a whole dedup index directory with the given days.
+    The days are written to a temporary directory first, which then takes the place
+    of the old one, so no day of an earlier cube survives.
+
+    Args:
+        index_dir (string): Dedup index directory
+        row_hashes (dict): Trending date mapped to its sorted row hashes
+    """
+    temp_dir = f"{index_dir}.{os.getpid()}.tmp"
+    old_dir = f"{index_dir}.{os.getpid()}.old"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    for date, hashes in row_hashes.items():
+        np.save(day_index_path(temp_dir, date), hashes)
+
+    if os.path.exists(index_dir):
+        os.replace(index_dir, old_dir)
+    os.replace(temp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def save_array(path, array):
+    """
+    Write a NumPy array atomically.
+
+    Args:
+        path (string): .npy file path
+        array (ndarray): Array to write
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(temp_path, array)
+    os.replace(temp_path, path)
+
+
+class TrendingCube:
+    def __init__(self, threshold=streaming.Q3_MIN_COMMENTS):
+        """
+        Class constructor method.
+
+        Args:
+            threshold (int): Comment count that "comments_over" rows exceed
+        """
+        # Initialization attributes
+        self.threshold = threshold
+
+        # Additional attributes
+        self.table = pd.DataFrame(
+            {col: pd.Series(dtype="int64") for col in VALUE_COLUMNS},
+            index=pd.MultiIndex.from_arrays([[], []], names=KEY_COLUMNS),
+        )
+        self.index_dir = None
+        self.row_hashes = {}
+        self.changed_days = set()
+
+    def day_hashes(self, date):
+        """
+        Sorted hashes of the counted rows of one trending date, read on first use.
+
+        Args:
+            date (string): Trending date
+
+        Returns:
+            ndarray: Sorted uint64 row hashes
+        """
+        if date not in self.row_hashes:
+            hashes = np.empty(0, dtype="uint64")
+            if self.index_dir is not None:
+                path = day_index_path(self.index_dir, date)
+                if os.path.exists(path):
+                    hashes = np.load(path, allow_pickle=False)
+            self.row_hashes[date] = hashes
+        return self.row_hashes[date]
+
+    def append(self, chunk):
+        """
+        Fold the rows of a chunk that were not counted yet into the cube.
+
+        Args:
+            chunk (DataFrame): Rows read with streaming.chunk_dtypes
+
+        Returns:
+            int: Number of new rows
+        """
+        # Drop duplicates inside the chunk, then against the rows counted before
+        # on the same trending dates (a duplicate row has the same date).
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        dates = chunk["trending_date"].fillna("").to_numpy()
+        for date, rows in pd.Series(dates).groupby(dates).indices.items():
+            rows = rows[keep[rows]]
+            known = self.day_hashes(date)
+            new = ~sketch.sorted_contains(known, hashes[rows])
+            keep[rows[~new]] = False
+            if new.any():
+                self.row_hashes[date] = sketch.sorted_insert(known, hashes[rows[new]])
+                self.changed_days.add(date)
+        chunk = chunk[keep]
+
+        comments = chunk["comment_count"].astype("int64")
+        cells = (
+            pd.DataFrame(
+                {
+                    "trending_date": chunk["trending_date"],
+                    "category_id": chunk["category_id"].astype("int64"),
+                    "count": 1,
+                    "views": chunk["views"].astype("int64"),
+                    "comments": comments,
+                    "comments_over": (comments > self.threshold).astype("int64"),
+                }
+            )
+            .groupby(KEY_COLUMNS)
+            .sum()
+        )
+        self.table = self.table.add(cells, fill_value=0).astype("int64").sort_index()
+        return len(chunk)
+
+    def append_csv(self, path, chunksize=CHUNK_SIZE):
+        """
+        Fold a trending file (the whole dump or one new day) into the cube.
+
+        Args:
+            path (string): CSV file with the videos.csv columns
+            chunksize (int): Rows per chunk
+
+        Returns:
+            int: Number of new rows
+        """
+        n_rows = 0
+        chunks = pd.read_csv(
+            path, dtype=streaming.chunk_dtypes(path), chunksize=chunksize
+        )
+        for chunk in chunks:
+            n_rows += self.append(chunk)
+        return n_rows
+
+    def save(self, path):
+        """
+        Write the cube atomically as a NumPy archive, with its dedup index: the days
+        that changed since it was loaded, or the whole index for a new cube.
+
+        Args:
+            path (string): Cube file path
+        """
+        new_index_dir = index_path(path)
+        if self.index_dir == new_index_dir:
+            # Saving back to the index it was loaded from: write the changed days.
+            os.makedirs(new_index_dir, exist_ok=True)
+            for date in self.changed_days:
+                save_array(day_index_path(new_index_dir, date), self.row_hashes[date])
+        else:
+            # A new cube (or a copy saved elsewhere) replaces the whole index, so the
+            # index always matches the cells. A copy reads every day first.
+            if self.index_dir is not None and os.path.isdir(self.index_dir):
+                for filename in os.listdir(self.index_dir):
+                    if filename.endswith(".npy"):
+                        self.day_hashes(urllib.parse.unquote(filename[: -len(".npy")]))
+            write_index(new_index_dir, self.row_hashes)
+        self.index_dir = new_index_dir
+        self.changed_days = set()
+
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(
+            temp_path,
+            threshold=np.int64(self.threshold),
+            trending_date=self.table.index.get_level_values(0).to_numpy(dtype=str),
+            category_id=self.table.index.get_level_values(1).to_numpy(dtype="int64"),
+            **{col: self.table[col].to_numpy() for col in VALUE_COLUMNS},
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a cube written by save(). Only the cells are read: the days of the
+        dedup index are read when an append needs them.
+
+        Args:
+            path (string): Cube file path
+
+        Returns:
+            TrendingCube: Loaded cube
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            cube = cls(threshold=int(archive["threshold"]))
+            index = pd.MultiIndex.from_arrays(
+                [archive["trending_date"].astype(object), archive["category_id"]],
+                names=KEY_COLUMNS,
+            )
+            cube.table = pd.DataFrame(
+                {col: archive[col] for col in VALUE_COLUMNS}, index=index
+            )
+        cube.index_dir = index_path(path)
+        return cube
+
+    def answer(self, question, category_names=None):
+        """
+        Answer a trending question from the cube cells.
+
+        Args:
+            question (string): "Q1", "Q3", "Q4" or "Q5"
+            category_names (dict): Category id mapped to its name (needed by Q5)
+
+        Returns:
+            object: Same answer as the in-memory question
+        """
+        table = self.table
+        if question == "Q1":
+            return int(table["count"].sum())
+
+        if question == "Q3":
+            if self.threshold != streaming.Q3_MIN_COMMENTS:
+                raise ValueError(f"Cube threshold is {self.threshold}, Q3 needs 10000")
+            dates = table.index.get_level_values("trending_date")
+            return int(table.loc[dates == streaming.Q3_DATE, "comments_over"].sum())
+
+        if question == "Q4":
+            # Sorted dates, so ties keep the first date like the groupby.
+            daily = table[["comments", "count"]].groupby(level="trending_date").sum()
+            means = daily["comments"] / daily["count"]
+            return means.index[int(np.argmin(means.to_numpy()))]
+
+        if question == "Q5":
+            names = table.index.get_level_values("category_id").map(
+                category_names or {}
+            )
+            selected = names.isin(streaming.Q5_CATEGORIES)
+            views = table.loc[selected, "views"]
+            daily_views = (
+                views.groupby(
+                    [views.index.get_level_values("trending_date"), names[selected]]
+                )
+                .sum()
+                .unstack()
+            )
+            if any(name not in daily_views for name in streaming.Q5_CATEGORIES):
+                return 0
+            # Days without views in one of the categories never count (NaN comparison).
+            return int((daily_views["Sports"] > daily_views["Comedy"]).sum())
+
+        raise ValueError(f"Question {question} cannot be answered from the cube")
+
+
+def cube_path(videos_path):
+    """
+    Locate the cube of a videos file, inside the dataset cache directory.
+
+    Args:
+        videos_path (string): videos.csv path
+
+    Returns:
+        string: Cube file path
+    """
+    directory = os.path.dirname(os.path.abspath(videos_path))
+    return os.path.join(directory, dataset.CACHE_DIR, CUBE_FILENAME)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trending rollup cube.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="build the cube from videos.csv")
+    append_parser = subparsers.add_parser("append", help="fold a new day into the cube")
+    answer_parser = subparsers.add_parser(
+        "answer", help="answer questions from the cube"
+    )
+    for target in (build_parser, append_parser, answer_parser):
+        target.add_argument("--videos", default="./videos.csv")
+        target.add_argument("--cube", default=None, help="cube file path")
+    append_parser.add_argument("day", help="trending CSV of the new day")
+    answer_parser.add_argument("questions", nargs="*", default=["Q1", "Q3", "Q4", "Q5"])
+    answer_parser.add_argument("--categories", default="./category_id.json")
+    args = parser.parse_args()
+
+    path = args.cube or cube_path(args.videos)
+    if args.command == "build":
+        cube = TrendingCube()
+        n_rows = cube.append_csv(args.videos)
+        cube.save(path)
+        print(f"Built {path}: {n_rows} rows, {len(cube.table)} cells")
+    elif args.command == "append":
+        cube = TrendingCube.load(path)
+        n_rows = cube.append_csv(args.day)
+        cube.save(path)
+        print(f"Appended {n_rows} new rows to {path}: {len(cube.table)} cells")
+    else:
+        cube = TrendingCube.load(path)
+        category_names = categories.category_names(args.categories)
+        for question in args.questions:
+            print(f"[{question}] {cube.answer(question, category_names)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+
+# The generic loader lives once in <repo>/common, shared by every grader folder.
+COMMON_DIR = os.path.realpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 4, "common")
+)
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+import datastore
+from datastore import CACHE_DIR, SharedDataset, fingerprint, load_csv, release, shared
+
+"""
+    DATASET SCHEMAS:
+    The datasets of this grader folder: the dtypes they are parsed with and the
+    columns each question reads. The loader itself (columnar sidecar cache, shared
+    handles) is common/datastore.py, and the names used here are re-exported from it.
+"""
+
+# Dataset schemas: dtypes to parse with, and the columns each question reads
+# (None means the question needs every column).
+SCHEMAS = {
+    "videos": {
+        "dtype": {
+            "trending_date": "category",
+            "category_id": "int16",
+            "views": "int64",
+            "likes": "int32",
+            "dislikes": "int32",
+            "comment_count": "int32",
+        },
+        # Duplicates are whole-row duplicates, so every column is parsed and the
+        # question columns are only projected after deduplication.
+        "parse_all_columns": True,
+        "deduplicate": True,
+        "columns": {
+            "Q1": [],
+            "Q2": ["title", "likes", "dislikes"],
+            "Q3": ["trending_date", "comment_count"],
+            "Q4": ["trending_date", "comment_count"],
+            "Q5": ["trending_date", "category_id", "views"],
+        },
+    },
+}
+
+datastore.register(SCHEMAS)
@@ -1,21 +1,33 @@
-import pandas as pd
+import dataset
+import grader
+import student
+import trending_dates
 from student import *
 
 
+def load(questions, path="./videos.csv"):
+    # The handle is shared with student.Q1, so the file is parsed and deduplicated once.
+    vdo_df = dataset.shared(path, schema="videos").frame(questions)
+
+    # Compare and group trending dates as int32 day ordinals instead of strings.
+    if "trending_date" in vdo_df:
+        vdo_df["trending_date"] = trending_dates.parse(vdo_df["trending_date"])
+    return vdo_df
+
+
+def answer(vdo_df, question, **options):
+    # Give each question a copy-on-write view, so one answer cannot affect the next
+    # and only the columns a question modifies are ever copied.
+    # (options are extra question arguments, e.g. the category_path of Q5.)
+    return f"{globals()[question](vdo_df.copy(deep=False), **options)}"
+
+
 def main():
     """
     ASSIGNMENT 1:
     Using pandas to explore youtube trending data from GB (GBvideos.csv and GB_category_id.json) and answer the questions.
     """
-
-    input_string = input().strip()
-    if input_string != "Q1":
-        vdo_df = pd.read_csv("./videos.csv")
-        vdo_df.drop_duplicates(inplace=True)
-        input_command = f"{input_string}(vdo_df)"
-    else:
-        input_command = f"{input_string}()"
-    print(f"{eval(input_command)}")
+    grader.run(load, answer, grader.find_questions(student))
 
 
 if __name__ == "__main__":
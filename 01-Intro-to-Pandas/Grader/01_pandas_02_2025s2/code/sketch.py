@@ -0,0 +1,217 @@
+import math
+import numpy as np
+import pandas as pd
+
+"""
+    DISTINCT COUNT SKETCHES:
+    Count distinct values (e.g. video titles) without keeping the values themselves.
+    Values are hashed to 64-bit integers with pandas' vectorized hashing.
+    HashedDistinct keeps the sorted distinct hashes (8 bytes per distinct value) and is
+    exact unless two values collide on 64 bits. HyperLogLog keeps 2 ** precision one-byte
+    registers whatever the input size; its relative standard error is
+    1.04 / sqrt(2 ** precision) (0.81% with the default precision of 14, 16 KiB).
+    Both sketches merge, so chunks or countries can be counted separately and combined.
+"""
+
+DEFAULT_PRECISION = 14
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+HASH_BITS = 64
+
+
+def hash_values(values):
+    """
+    Hash values to 64-bit integers. Missing values share one hash, so they count
+    as one distinct value like in drop_duplicates.
+
+    Args:
+        values (array-like): Values to hash
+
+    Returns:
+        ndarray: uint64 hashes
+    """
+    if isinstance(values, (pd.Series, pd.Index)):
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def sorted_contains(sorted_values, values):
+    """
+    Test the membership of values in a sorted array by binary search.
+
+    Args:
+        sorted_values (ndarray): Sorted array
+        values (ndarray): Values to look up
+
+    Returns:
+        ndarray: Boolean mask, True where the value is in sorted_values
+    """
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    positions = np.searchsorted(sorted_values, values).clip(max=len(sorted_values) - 1)
+    return sorted_values[positions] == values
+
+
+def sorted_insert(sorted_values, values):
+    """
+    Insert new values into a sorted array.
+
+    Args:
+        sorted_values (ndarray): Sorted array
+        values (ndarray): Values that are not in sorted_values yet
+
+    Returns:
+        ndarray: Sorted array of both
+    """
+    # Both parts are sorted, so the stable sort (timsort) only merges two runs.
+    merged = np.concatenate([sorted_values, np.sort(values)])
+    return np.sort(merged, kind="stable")
+
+
+def bit_length(values):
+    """
+    Number of bits needed to represent unsigned integers (0 for 0).
+
+    Args:
+        values (ndarray): uint64 values
+
+    Returns:
+        ndarray: int64 bit lengths
+    """
+    # frexp gives the exponent of the float value, which can round up to the next
+    # power of two for large integers, so correct those by one.
+    exponent = np.frexp(values.astype(np.float64))[1].astype(np.int64)
+    exponent = np.minimum(exponent, HASH_BITS)
+    low_bit = np.left_shift(np.uint64(1), np.maximum(exponent - 1, 0).astype(np.uint64))
+    return exponent - ((values < low_bit) & (values > 0))
+
+
+class HashedDistinct:
+    def __init__(self):
+        """
+        Class constructor method.
+        """
+        # Additional attributes
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+
+        Args:
+            values (array-like): Values to count
+
+        Returns:
+            HashedDistinct: The sketch itself
+        """
+        self.hashes = np.union1d(self.hashes, hash_values(values))
+        return self
+
+    def merge(self, other):
+        """
+        Add the distinct values of another sketch.
+
+        Args:
+            other (HashedDistinct): Sketch of other values
+
+        Returns:
+            HashedDistinct: The sketch itself
+        """
+        self.hashes = np.union1d(self.hashes, other.hashes)
+        return self
+
+    def count(self):
+        """
+        Number of distinct values.
+
+        Returns:
+            int: Distinct count
+        """
+        return len(self.hashes)
+
+
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION):
+        """
+        Class constructor method.
+
+        Args:
+            precision (int): Number of index bits, the sketch keeps 2 ** precision registers
+        """
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f"precision must be between {MIN_PRECISION} and {MAX_PRECISION}, got {precision}"
+            )
+
+        # Initialization attributes
+        self.precision = precision
+
+        # Additional attributes
+        self.n_registers = 1 << precision
+        self.registers = np.zeros(self.n_registers, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """
+        Relative standard error of count().
+
+        Returns:
+            float: 1.04 / sqrt(number of registers)
+        """
+        return 1.04 / math.sqrt(self.n_registers)
+
+    def update(self, values):
+        """
+        Add values to the sketch.
+
+        Args:
+            values (array-like): Values to count
+
+        Returns:
+            HyperLogLog: The sketch itself
+        """
+        hashes = hash_values(values)
+        value_bits = HASH_BITS - self.precision
+
+        # The first bits choose the register, the position of the first set bit
+        # of the remaining bits is the rank kept by the register.
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << value_bits) - 1)
+        rank = (value_bits - bit_length(remainder) + 1).astype(np.uint8)
+
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other):
+        """
+        Add the distinct values of another sketch of the same precision.
+
+        Args:
+            other (HyperLogLog): Sketch of other values
+
+        Returns:
+            HyperLogLog: The sketch itself
+        """
+        if other.precision != self.precision:
+            raise ValueError("Only sketches with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Estimate the number of distinct values.
+
+        Returns:
+            int: Estimated distinct count
+        """
+        m = self.n_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = (
+            alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        )
+
+        # Small cardinalities: linear counting on the empty registers is more accurate.
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty > 0:
+            estimate = m * math.log(m / empty)
+        return int(round(estimate))
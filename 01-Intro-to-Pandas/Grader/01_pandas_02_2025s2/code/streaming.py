@@ -0,0 +1,254 @@
+import argparse
+import numpy as np
+import pandas as pd
+import categories
+import dataset
+import sketch
+
+"""
+    OUT-OF-CORE TRENDING ANSWERS:
+    Answer the YouTube trending questions (Q1-Q5) by reading videos.csv in chunks.
+    Only the current chunk and a small incremental state stay in memory: the row hashes
+    seen so far (for drop_duplicates across chunks: one sorted uint64 array per trending
+    date, 8 bytes per row, probed by binary search), a distinct-title sketch for Q2, the
+    count of Q3, a sum/count per trending date for Q4 and a views sum per (date, category) for Q5.
+    The answers are the same as the in-memory questions of student.py.
+"""
+
+CHUNK_SIZE = 100_000
+
+# Constants of the questions (see student.py).
+Q3_DATE = "18.22.01"
+Q3_MIN_COMMENTS = 10000
+Q5_CATEGORIES = ("Sports", "Comedy")
+
+
+def chunk_dtypes(path):
+    """
+    Build the read_csv dtypes of the chunks: the numeric columns of the videos schema,
+    and plain strings for everything else, so every chunk hashes its rows the same way
+    whatever values it happens to contain.
+
+    Args:
+        path (string): videos.csv path
+
+    Returns:
+        dict: Column name mapped to its dtype
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    schema_dtype = dataset.SCHEMAS["videos"]["dtype"]
+    return {
+        col: (
+            schema_dtype[col] if col in schema_dtype and col != "trending_date" else str
+        )
+        for col in header
+    }
+
+
+def accumulate(total, part):
+    """
+    Add the per-key sums of a chunk to the running per-key sums.
+
+    Args:
+        total (Series): Running sums, or None before the first chunk
+        part (Series): Sums of one chunk
+
+    Returns:
+        Series: Running int64 sums over the union of the keys
+    """
+    if total is None:
+        return part.astype("int64")
+    return total.add(part, fill_value=0).astype("int64")
+
+
+class TrendingState:
+    def __init__(
+        self, category_names=None, approx=False, precision=sketch.DEFAULT_PRECISION
+    ):
+        """
+        Class constructor method.
+
+        Args:
+            category_names (dict): Category id mapped to its name (needed by Q5)
+            approx (bool): Estimate Q2 with a HyperLogLog sketch instead of exact hashes
+            precision (int): HyperLogLog precision
+        """
+        # Initialization attributes
+        self.category_names = category_names or {}
+
+        # Additional attributes
+        self.seen_rows = {}
+        self.n_rows = 0
+        self.titles = (
+            sketch.HyperLogLog(precision) if approx else sketch.HashedDistinct()
+        )
+        self.q3_count = 0
+        self.comment_sum = None
+        self.comment_count = None
+        self.category_views = None
+
+        # Category ids of the Q5 categories.
+        self.q5_ids = {
+            category_id: name
+            for category_id, name in self.category_names.items()
+            if name in Q5_CATEGORIES
+        }
+
+    def deduplicate(self, chunk):
+        """
+        Drop the rows of a chunk that were already seen, in this chunk or an earlier one.
+
+        Args:
+            chunk (DataFrame): Chunk of videos.csv
+
+        Returns:
+            DataFrame: Rows seen for the first time
+        """
+        # Duplicate rows share their trending date, so every date keeps its own
+        # sorted hashes and a chunk only probes and extends the dates it holds.
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        dates = chunk["trending_date"].fillna("").to_numpy()
+        for date, rows in pd.Series(dates).groupby(dates).indices.items():
+            rows = rows[keep[rows]]
+            seen = self.seen_rows.get(date, np.empty(0, dtype=np.uint64))
+            unseen = ~sketch.sorted_contains(seen, hashes[rows])
+            keep[rows[~unseen]] = False
+            if unseen.any():
+                self.seen_rows[date] = sketch.sorted_insert(seen, hashes[rows[unseen]])
+        return chunk[keep]
+
+    def update(self, chunk):
+        """
+        Fold one chunk into the state of every question.
+
+        Args:
+            chunk (DataFrame): Chunk of videos.csv
+        """
+        chunk = self.deduplicate(chunk)
+        self.n_rows += len(chunk)
+
+        # Q2: distinct titles of the videos with more dislikes than likes.
+        titles = chunk.loc[chunk["dislikes"] > chunk["likes"], "title"]
+        self.titles.update(titles)
+
+        # Q3: trending rows of one date with many comments.
+        self.q3_count += int(
+            (
+                (chunk["trending_date"] == Q3_DATE)
+                & (chunk["comment_count"] > Q3_MIN_COMMENTS)
+            ).sum()
+        )
+
+        # Q4: exact integer sum and count of the comments per trending date.
+        comments = (
+            chunk["comment_count"].astype("int64").groupby(chunk["trending_date"])
+        )
+        self.comment_sum = accumulate(self.comment_sum, comments.sum())
+        self.comment_count = accumulate(self.comment_count, comments.count())
+
+        # Q5: total views per (trending date, category) of the compared categories.
+        rows = chunk[chunk["category_id"].isin(list(self.q5_ids))]
+        views = (
+            rows["views"]
+            .astype("int64")
+            .groupby([rows["trending_date"], rows["category_id"].map(self.q5_ids)])
+            .sum()
+        )
+        self.category_views = accumulate(self.category_views, views)
+
+    def answer(self, question):
+        """
+        Answer a question from the accumulated state.
+
+        Args:
+            question (string): Question name, "Q1" to "Q5"
+
+        Returns:
+            object: Same answer as the in-memory question
+        """
+        if question == "Q1":
+            return self.n_rows
+        if question == "Q2":
+            return self.titles.count()
+        if question == "Q3":
+            return self.q3_count
+        if question == "Q4":
+            if self.comment_sum is None:
+                return None
+            # Dates are in sorted order, so ties keep the first date like the groupby.
+            means = self.comment_sum.sort_index() / self.comment_count.sort_index()
+            return means.index[int(np.argmin(means.to_numpy()))]
+        if question == "Q5":
+            if self.category_views is None:
+                return 0
+            daily_views = self.category_views.unstack()
+            for name in Q5_CATEGORIES:
+                if name not in daily_views:
+                    return 0
+            # Days without views in one of the categories never count (NaN comparison).
+            return int((daily_views["Sports"] > daily_views["Comedy"]).sum())
+        raise ValueError(f"Unknown question: {question}")
+
+
+def stream_answers(
+    path,
+    questions=None,
+    category_path=None,
+    chunksize=CHUNK_SIZE,
+    approx=False,
+    precision=sketch.DEFAULT_PRECISION,
+):
+    """
+    Answer the trending questions in one chunked pass over videos.csv.
+
+    Args:
+        path (string): videos.csv path
+        questions (list): Question names, Q1 to Q5 when None
+        category_path (string): category_id.json path (needed by Q5)
+        chunksize (int): Rows per chunk
+        approx (bool): Estimate Q2 with a HyperLogLog sketch
+        precision (int): HyperLogLog precision
+
+    Returns:
+        dict: Question name mapped to its answer
+    """
+    if questions is None:
+        questions = ["Q1", "Q2", "Q3", "Q4", "Q5"]
+
+    category_names = None
+    if category_path is not None:
+        category_names = categories.category_names(category_path)
+
+    state = TrendingState(category_names, approx, precision)
+    chunks = pd.read_csv(path, dtype=chunk_dtypes(path), chunksize=chunksize)
+    for chunk in chunks:
+        state.update(chunk)
+
+    return {question: state.answer(question) for question in questions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked trending answers.")
+    parser.add_argument("questions", nargs="*", default=None)
+    parser.add_argument("--videos", default="./videos.csv")
+    parser.add_argument("--categories", default="./category_id.json")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--approx", action="store_true", help="HyperLogLog Q2")
+    parser.add_argument("--precision", type=int, default=sketch.DEFAULT_PRECISION)
+    args = parser.parse_args()
+
+    answers = stream_answers(
+        args.videos,
+        args.questions or None,
+        args.categories,
+        args.chunksize,
+        args.approx,
+        args.precision,
+    )
+    for question, value in answers.items():
+        print(f"[{question}] {value}")
+
+
+if __name__ == "__main__":
+    main()
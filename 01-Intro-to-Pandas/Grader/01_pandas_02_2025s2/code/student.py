@@ -1,5 +1,8 @@
 import pandas as pd
-import json
+import categories
+import dataset
+import sketch
+import trending_dates
 
 """
     ASSIGNMENT 1 (STUDENT VERSION):
@@ -7,32 +10,37 @@ import json
 """
 
 
-def Q1():
+def Q1(vdo_df=None):
     """
     1. How many rows are there in the videos.csv after removing duplications?
     - To access 'videos.csv', use the path '/data/videos.csv'.
+    - When the grader passes vdo_df, its duplicate rows have already been removed.
     """
-    # Load data from videos.csv into a DataFrame.
-    vdo_df = pd.read_csv("/data/videos.csv")
+    # Reuse the deduplicated frame of the grader when there is one.
+    if vdo_df is not None:
+        return vdo_df.shape[0]
 
-    # Remove duplicate rows.
-    vdo_df = vdo_df.drop_duplicates()
-
-    # Count amount of the remaining videos.
-    return vdo_df.shape[0]
+    # Otherwise count the rows of the process-wide handle, which parses and
+    # deduplicates videos.csv at most once.
+    return dataset.shared("/data/videos.csv", schema="videos").n_rows
 
 
-def Q2(vdo_df):
+def Q2(vdo_df, approx=False, precision=sketch.DEFAULT_PRECISION):
     """
     2. How many VDO that have "dislikes" more than "likes"? Make sure that you count only unique title!
         - videos.csv has been loaded into memory and is ready to be utilized as vdo_df
         - The duplicate rows of vdo_df have been removed.
+        - approx=True estimates the count with a HyperLogLog sketch of 2 ** precision registers
+          (relative standard error 1.04 / sqrt(2 ** precision)).
     """
     # Condition to filter the videos with dislikes more than likes.
     FILTER_CONDITIONS = vdo_df["dislikes"] > vdo_df["likes"]
+    titles = vdo_df.loc[FILTER_CONDITIONS, "title"]
 
-    # Count amount of the unique remaining videos.
-    return vdo_df[FILTER_CONDITIONS].drop_duplicates(subset=["title"]).shape[0]
+    # Count amount of the unique remaining videos, from 64-bit title hashes instead of the title strings.
+    if approx:
+        return sketch.HyperLogLog(precision).update(titles).count()
+    return sketch.HashedDistinct().update(titles).count()
 
 
 def Q3(vdo_df):
@@ -41,9 +49,13 @@ def Q3(vdo_df):
         - videos.csv has been loaded into memory and is ready to be utilized as vdo_df
         - The duplicate rows of vdo_df have been removed.
         - The trending date of vdo_df is represented as 'YY.DD.MM'. For example, January 22, 2018, is represented as '18.22.01'.
+        - The grader parses the trending date into an int32 day ordinal (see trending_dates.py);
+          raw 'YY.DD.MM' strings are parsed here.
     """
+    TRENDING_DATES = trending_dates.ordinals(vdo_df["trending_date"])
+
     # Condition to filter the videos that are trending on 22 Jan 2018 with comments more than 10,000 comments.
-    FILTER_CONDITIONS = (vdo_df["trending_date"] == "18.22.01") & (
+    FILTER_CONDITIONS = (TRENDING_DATES == trending_dates.to_ordinal("18.22.01")) & (
         vdo_df["comment_count"] > 10000
     )
 
@@ -56,10 +68,14 @@ def Q4(vdo_df):
     4. Which trending date that has the minimum average number of comments per VDO?
         - videos.csv has been loaded into memory and is ready to be utilized as vdo_df
         - The duplicate rows of vdo_df have been removed.
+        - The trending date may be a day ordinal or a raw 'YY.DD.MM' string.
     """
+    TRENDING_DATES = trending_dates.ordinals(vdo_df["trending_date"])
+
     # Calculate average number of comments (group by trending date) then create a new column called "avg_comment_count".
     grouped_vdo_df = (
-        vdo_df.groupby("trending_date")["comment_count"]
+        vdo_df["comment_count"]
+        .groupby(TRENDING_DATES, observed=True)
         .mean()
         .reset_index(name="avg_comment_count")
     )
@@ -69,56 +85,52 @@ def Q4(vdo_df):
         grouped_vdo_df["avg_comment_count"] == grouped_vdo_df["avg_comment_count"].min()
     )
 
-    # Return the trending date that have minimum average comment count.
-    return grouped_vdo_df[FILTER_CONDITIONS]["trending_date"].iloc[0]
+    # Return the trending date that have minimum average comment count, formatted back to 'YY.DD.MM'.
+    # (On a tie, keep the first date in 'YY.DD.MM' order, as when grouping the raw strings.)
+    return min(
+        trending_dates.format_dates(grouped_vdo_df[FILTER_CONDITIONS]["trending_date"])
+    )
 
 
-def Q5(vdo_df):
+def Q5(vdo_df, category_path="/data/category_id.json"):
     """
     5. Compare "Sports" and "Comedy", how many days that there are more total daily views of VDO in "Sports" category than in "Comedy" category?
         - videos.csv has been loaded into memory and is ready to be utilized as vdo_df
         - The duplicate rows of vdo_df have been removed.
         - You must load the additional data from 'category_id.json' into memory before executing any operations.
         - To access 'category_id.json', use the path '/data/category_id.json'.
+        - category_path points to the category file of another country dump.
     """
-    # Load categories information from the JSON file.
-    categories_df = pd.read_json("/data/category_id.json")
-
-    # Create video categories mappings
-    CATEGORIES_MAPPINGS = {}
-    for data in categories_df["items"]:
-        # Extract the category ID and name from raw value.
-        category_id = int(data["id"])
-        category_name = data["snippet"]["title"]
-
-        # Store the mappings to a dict.
-        CATEGORIES_MAPPINGS[category_id] = category_name
-
-    # Use deep copy, so it won't affect the original DataFrame.
-    modified_vdo_df = vdo_df.copy()
-
-    # Create the category_name column by mapping values.
-    modified_vdo_df["category_name"] = modified_vdo_df["category_id"].map(
-        CATEGORIES_MAPPINGS
-    )
-
-    FILTER_CONDITIONS = modified_vdo_df["category_name"].isin(["Sports", "Comedy"])
-
-    modified_vdo_df = modified_vdo_df[FILTER_CONDITIONS]
-
-    # Create a pivot table to find total daily views of each category.
-    vdo_pivot_table = modified_vdo_df.pivot_table(
-        index=["trending_date"],
-        columns=["category_name"],
-        values=["views"],
-        aggfunc="sum",
+    # Load categories information from the JSON file (parsed once, then cached),
+    # and resolve the compared category names to their ids.
+    CATEGORIES_MAPPINGS = categories.category_ids(category_path, ["Sports", "Comedy"])
+
+    # Keep the videos of the compared categories with an integer mask (no copy of the whole DataFrame).
+    FILTER_CONDITIONS = vdo_df["category_id"].isin(list(CATEGORIES_MAPPINGS))
+    modified_vdo_df = vdo_df[FILTER_CONDITIONS]
+
+    # Total daily views of each category id, then of each category name (small table).
+    id_daily_views = modified_vdo_df.groupby(
+        ["trending_date", "category_id"], observed=True
+    )["views"].sum()
+    daily_views = (
+        id_daily_views.groupby(
+            [
+                id_daily_views.index.get_level_values("trending_date"),
+                id_daily_views.index.get_level_values("category_id").map(
+                    CATEGORIES_MAPPINGS
+                ),
+            ],
+            observed=True,
+        )
+        .sum()
+        .unstack()
     )
 
     # Filter trending days with sports video is more than comedy video total daily views
-    FILTER_CONDITIONS = (
-        vdo_pivot_table[("views", "Sports")] > vdo_pivot_table[("views", "Comedy")]
-    )
-    vdo_pivot_table = vdo_pivot_table[FILTER_CONDITIONS]
+    # (a day without views in one of the categories is not counted).
+    FILTER_CONDITIONS = daily_views["Sports"] > daily_views["Comedy"]
+    daily_views = daily_views[FILTER_CONDITIONS]
 
-    # Return number of videos.
-    return vdo_pivot_table.shape[0]
+    # Return number of days.
+    return daily_views.shape[0]
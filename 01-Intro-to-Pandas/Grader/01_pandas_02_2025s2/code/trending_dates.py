@@ -0,0 +1,196 @@
+import datetime
+import numpy as np
+import pandas as pd
+
+"""
+    TRENDING DATES:
+    The trending_date column of the YouTube data is a fixed-width 'YY.DD.MM' string
+    (January 22, 2018 is '18.22.01'). parse() turns it into an int32 day ordinal
+    (days since 1970-01-01) with vectorized byte arithmetic instead of a per-row
+    strptime, so filters compare integers and groupbys hash 4-byte keys.
+    Ordinals convert back to 'YY.DD.MM' with format_dates(), and between() / weekday()
+    give date-range and day-of-week filters without any string scan.
+"""
+
+DATE_WIDTH = 8
+DIGIT_POSITIONS = [0, 1, 3, 4, 6, 7]
+SEPARATOR_POSITIONS = [2, 5]
+CENTURY = 2000
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday (Monday is 0).
+
+
+def parse_strings(values):
+    """
+    Parse 'YY.DD.MM' strings into day ordinals.
+
+    Args:
+        values (array-like): 'YY.DD.MM' strings
+
+    Returns:
+        ndarray: int32 days since 1970-01-01
+    """
+    # One extra byte per value catches strings longer than the format.
+    raw = np.asarray(values, dtype=f"S{DATE_WIDTH + 1}")
+    raw = raw.view(np.uint8).reshape(len(raw), DATE_WIDTH + 1)
+
+    digits = raw[:, DIGIT_POSITIONS].astype(np.int32) - ord("0")
+    valid = (
+        (raw[:, DATE_WIDTH] == 0)
+        & (raw[:, SEPARATOR_POSITIONS] == ord(".")).all(axis=1)
+        & ((digits >= 0) & (digits <= 9)).all(axis=1)
+    )
+
+    year = CENTURY + digits[:, 0] * 10 + digits[:, 1]
+    day = digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+    if not valid.all():
+        raise ValueError(f"Invalid trending date: {np.asarray(values)[~valid][0]!r}")
+
+    # First day of the month, plus the day of the month.
+    months = (year - 1970) * 12 + (month - 1)
+    first_day = months.astype("datetime64[M]").astype("datetime64[D]")
+    dates = first_day + (day - 1).astype("timedelta64[D]")
+
+    # A day past the end of its month rolls over into the next month.
+    overflow = dates.astype("datetime64[M]") != first_day.astype("datetime64[M]")
+    if overflow.any():
+        raise ValueError(f"Invalid trending date: {np.asarray(values)[overflow][0]!r}")
+
+    return dates.astype(np.int64).astype(np.int32)
+
+
+def parse(values):
+    """
+    Parse a trending_date column into day ordinals.
+    Only the distinct dates (or the categories of a categorical column) are parsed.
+
+    Args:
+        values (Series): 'YY.DD.MM' strings or categories
+
+    Returns:
+        Series: int32 days since 1970-01-01, with the same index
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        if (codes < 0).any():
+            raise ValueError("Missing trending date")
+        ordinals = parse_strings(values.cat.categories.to_numpy(dtype=str))[codes]
+    else:
+        # A dump has a few hundred distinct dates, so only the distinct strings are parsed.
+        codes, uniques = pd.factorize(values)
+        if (codes < 0).any():
+            raise ValueError("Missing trending date")
+        ordinals = parse_strings(np.asarray(uniques, dtype=str))[codes]
+
+    return pd.Series(ordinals, index=values.index, name=values.name)
+
+
+def ordinals(values):
+    """
+    Day ordinals of a trending_date column, whether it was already parsed or not.
+
+    Args:
+        values (Series): Day ordinals, or 'YY.DD.MM' strings or categories
+
+    Returns:
+        Series: Days since 1970-01-01 (values itself when it is already an integer column)
+    """
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return values
+    return parse(values)
+
+
+def to_ordinal(value):
+    """
+    Convert one date to a day ordinal.
+
+    Args:
+        value (string, date or int): 'YY.DD.MM' string, datetime.date or day ordinal
+
+    Returns:
+        int: Days since 1970-01-01
+    """
+    if isinstance(value, str):
+        return int(parse_strings([value])[0])
+    if isinstance(value, datetime.date):
+        return (value - datetime.date(1970, 1, 1)).days
+    return int(value)
+
+
+def format_dates(ordinals):
+    """
+    Format day ordinals back to 'YY.DD.MM' strings.
+
+    Args:
+        ordinals (array-like): Days since 1970-01-01
+
+    Returns:
+        ndarray: 'YY.DD.MM' strings
+    """
+    dates = np.asarray(ordinals, dtype=np.int64).astype("datetime64[D]")
+    months = dates.astype("datetime64[M]")
+    year = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (dates - months.astype("datetime64[D]")).astype(np.int64) + 1
+
+    parts = [(year % 100).astype(str), day.astype(str), month.astype(str)]
+    parts = [np.char.zfill(part, 2) for part in parts]
+    return np.char.add(
+        np.char.add(np.char.add(parts[0], "."), parts[1] + "."), parts[2]
+    )
+
+
+def format_date(ordinal):
+    """
+    Format one day ordinal as a 'YY.DD.MM' string.
+
+    Args:
+        ordinal (int): Days since 1970-01-01
+
+    Returns:
+        string: 'YY.DD.MM' date
+    """
+    return str(format_dates([ordinal])[0])
+
+
+def between(ordinals, start, end):
+    """
+    Select the rows trending between two dates (both included).
+
+    Args:
+        ordinals (Series): Day ordinals from parse()
+        start (string, date or int): First date
+        end (string, date or int): Last date
+
+    Returns:
+        Series: Boolean mask
+    """
+    return ordinals.between(to_ordinal(start), to_ordinal(end))
+
+
+def weekday(ordinals):
+    """
+    Day of the week of day ordinals.
+
+    Args:
+        ordinals (Series): Day ordinals from parse()
+
+    Returns:
+        Series: Day of the week, Monday is 0 and Sunday is 6
+    """
+    return ((ordinals.astype(np.int64) + EPOCH_WEEKDAY) % 7).astype(np.int8)
+
+
+def on_weekdays(ordinals, days):
+    """
+    Select the rows trending on some days of the week.
+
+    Args:
+        ordinals (Series): Day ordinals from parse()
+        days (list): Days of the week, Monday is 0 and Sunday is 6
+
+    Returns:
+        Series: Boolean mask
+    """
+    return weekday(ordinals).isin(days)
@@ -0,0 +1,348 @@
+import json
+import numpy as np
+import pandas as pd
+import profiler
+
+"""
+    FITTED PREPROCESSING TRANSFORMERS:
+    The Titanic cleaning steps as fit-once / transform-many objects.
+    fit() learns the statistics of a training frame once (IQR bounds, mean/mode fill
+    values, dummy categories); transform() then applies them to any batch of records,
+    vectorized and without re-fitting or keeping a reference to the training frame.
+    Fitted transformers serialize to plain JSON with dump() and load().
+"""
+
+
+def as_frame(records):
+    """
+    Accept a DataFrame or a batch of records.
+
+    Args:
+        records (DataFrame or list): DataFrame, or list of dicts (one per record)
+
+    Returns:
+        DataFrame: Records as a DataFrame
+    """
+    if isinstance(records, pd.DataFrame):
+        return records
+    return pd.DataFrame.from_records(records)
+
+
+def to_builtin(value):
+    """
+    Convert a NumPy scalar to the matching Python value, so it can be written as JSON.
+
+    Args:
+        value (object): Scalar
+
+    Returns:
+        object: Python scalar
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class IQRClipper:
+    def __init__(self, columns, factor=1.5):
+        """
+        Class constructor method.
+
+        Args:
+            columns (list): Numeric columns to clip
+            factor (float): Bounds are Q1 - factor * IQR and Q3 + factor * IQR
+        """
+        # Initialization attributes
+        self.columns = list(columns)
+        self.factor = factor
+
+        # Additional attributes
+        self.bounds = None
+
+    def fit(self, df):
+        """
+        Learn the clipping bounds of every column.
+
+        Args:
+            df (DataFrame): Training data
+
+        Returns:
+            IQRClipper: Fitted clipper
+        """
+        column_profile = profiler.profile(df[self.columns], quantiles=(0.25, 0.75))
+        q1 = column_profile[profiler.quantile_name(0.25)]
+        q3 = column_profile[profiler.quantile_name(0.75)]
+        iqr = q3 - q1
+
+        self.bounds = {
+            col: [
+                float(q1[col] - self.factor * iqr[col]),
+                float(q3[col] + self.factor * iqr[col]),
+            ]
+            for col in self.columns
+        }
+        return self
+
+    def transform(self, records):
+        """
+        Replace values outside the bounds with the nearest bound.
+
+        Args:
+            records (DataFrame or list): Batch of records
+
+        Returns:
+            DataFrame: Clipped copy (missing values stay missing)
+        """
+        df = as_frame(records).copy(deep=False)
+        for col, (lower_bound, upper_bound) in self.bounds.items():
+            df[col] = df[col].clip(lower_bound, upper_bound)
+        return df
+
+    def to_dict(self):
+        """
+        Serializable state of the clipper.
+
+        Returns:
+            dict: JSON-compatible parameters and fitted values
+        """
+        return {"columns": self.columns, "factor": self.factor, "bounds": self.bounds}
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a fitted clipper from its serialized state.
+
+        Args:
+            state (dict): State returned by to_dict()
+
+        Returns:
+            IQRClipper: Fitted clipper
+        """
+        transformer = cls(state["columns"], state["factor"])
+        transformer.bounds = state["bounds"]
+        return transformer
+
+
+class MeanModeImputer:
+    def __init__(self, columns=None, impute_categorical=True):
+        """
+        Class constructor method.
+
+        Args:
+            columns (list): Columns to impute, every column of the training data when None
+            impute_categorical (bool): Also impute non-numeric columns with their mode
+        """
+        # Initialization attributes
+        self.columns = columns
+        self.impute_categorical = impute_categorical
+
+        # Additional attributes
+        self.fill_values = None
+
+    def fit(self, df):
+        """
+        Learn the mean of the numeric columns and the mode of the other columns.
+
+        Args:
+            df (DataFrame): Training data
+
+        Returns:
+            MeanModeImputer: Fitted imputer
+        """
+        columns = df.columns if self.columns is None else self.columns
+        numeric_cols = df[columns].select_dtypes(include="number").columns
+        means = df[numeric_cols].mean()
+
+        self.fill_values = {}
+        for col in columns:
+            if col in numeric_cols:
+                self.fill_values[col] = to_builtin(means[col])
+            elif self.impute_categorical:
+                # Ties keep the smallest value, as mode().iloc[0].
+                mode = df[col].mode()
+                if len(mode) > 0:
+                    self.fill_values[col] = to_builtin(mode.iloc[0])
+        return self
+
+    def transform(self, records):
+        """
+        Fill the missing values with the learned values.
+
+        Args:
+            records (DataFrame or list): Batch of records
+
+        Returns:
+            DataFrame: Imputed copy
+        """
+        df = as_frame(records)
+        fill_values = {
+            col: value for col, value in self.fill_values.items() if col in df
+        }
+        return df.fillna(fill_values)
+
+    def to_dict(self):
+        """
+        Serializable state of the imputer.
+
+        Returns:
+            dict: JSON-compatible parameters and fitted values
+        """
+        return {
+            "columns": self.columns,
+            "impute_categorical": self.impute_categorical,
+            "fill_values": self.fill_values,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a fitted imputer from its serialized state.
+
+        Args:
+            state (dict): State returned by to_dict()
+
+        Returns:
+            MeanModeImputer: Fitted imputer
+        """
+        transformer = cls(state["columns"], state["impute_categorical"])
+        transformer.fill_values = state["fill_values"]
+        return transformer
+
+
+class DummyEncoder:
+    def __init__(self, columns, dtype="bool"):
+        """
+        Class constructor method.
+
+        Args:
+            columns (list): Categorical columns to encode
+            dtype (string): Dtype of the dummy columns (bool, as pd.get_dummies)
+        """
+        # Initialization attributes
+        self.columns = list(columns)
+        self.dtype = dtype
+
+        # Additional attributes
+        self.categories = None
+
+    def fit(self, df):
+        """
+        Fix the category set of every column (the categories of a categorical
+        column, the sorted distinct values otherwise, as pd.get_dummies).
+
+        Args:
+            df (DataFrame): Training data
+
+        Returns:
+            DummyEncoder: Fitted encoder
+        """
+        self.categories = {}
+        for col in self.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                categories = values.cat.categories
+            else:
+                categories = pd.Index(values.dropna().unique()).sort_values()
+            self.categories[col] = [to_builtin(value) for value in categories]
+        return self
+
+    def transform(self, records):
+        """
+        Replace every encoded column by one <column>_<category> dummy column per
+        fitted category. Missing and unseen values get no dummy set.
+
+        Args:
+            records (DataFrame or list): Batch of records
+
+        Returns:
+            DataFrame: Encoded copy, dummy columns appended at the end
+        """
+        df = as_frame(records)
+        dummies = {}
+        for col, categories in self.categories.items():
+            codes = pd.Categorical(df[col], categories=categories).codes
+            one_hot = codes[:, None] == np.arange(len(categories))
+            for position, category in enumerate(categories):
+                dummies[f"{col}_{category}"] = one_hot[:, position]
+
+        dummy_df = pd.DataFrame(dummies, index=df.index).astype(self.dtype)
+        return pd.concat([df.drop(columns=list(self.categories)), dummy_df], axis=1)
+
+    def to_dict(self):
+        """
+        Serializable state of the encoder.
+
+        Returns:
+            dict: JSON-compatible parameters and fitted values
+        """
+        return {
+            "columns": self.columns,
+            "dtype": self.dtype,
+            "categories": self.categories,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Rebuild a fitted encoder from its serialized state.
+
+        Args:
+            state (dict): State returned by to_dict()
+
+        Returns:
+            DummyEncoder: Fitted encoder
+        """
+        transformer = cls(state["columns"], state["dtype"])
+        transformer.categories = state["categories"]
+        return transformer
+
+
+TRANSFORMERS = {
+    cls.__name__: cls for cls in (IQRClipper, MeanModeImputer, DummyEncoder)
+}
+
+
+def dump(transformers, path):
+    """
+    Write fitted transformers (applied in list order) to a JSON file.
+
+    Args:
+        transformers (list): Fitted transformers
+        path (string): JSON file path
+    """
+    steps = [
+        {"type": type(transformer).__name__, "state": transformer.to_dict()}
+        for transformer in transformers
+    ]
+    with open(path, "w") as file:
+        json.dump(steps, file, indent=2)
+
+
+def load(path):
+    """
+    Read fitted transformers written by dump().
+
+    Args:
+        path (string): JSON file path
+
+    Returns:
+        list: Fitted transformers, in list order
+    """
+    with open(path) as file:
+        steps = json.load(file)
+    return [TRANSFORMERS[step["type"]].from_dict(step["state"]) for step in steps]
+
+
+def transform(transformers, records):
+    """
+    Apply fitted transformers one after the other.
+
+    Args:
+        transformers (list): Fitted transformers
+        records (DataFrame or list): Batch of records
+
+    Returns:
+        DataFrame: Transformed records
+    """
+    df = as_frame(records)
+    for transformer in transformers:
+        df = transformer.transform(df)
+    return df
@@ -0,0 +1,45 @@
+import os
+import sys
+
+# The generic loader lives once in <repo>/common, shared by every grader folder.
+COMMON_DIR = os.path.realpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 4, "common")
+)
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+import datastore
+from datastore import CACHE_DIR, SharedDataset, fingerprint, load_csv, release, shared
+
+"""
+    DATASET SCHEMAS:
+    The datasets of this grader folder: the dtypes they are parsed with and the
+    columns each question reads. The loader itself (columnar sidecar cache, shared
+    handles) is common/datastore.py, and the names used here are re-exported from it.
+"""
+
+# Dataset schemas: dtypes to parse with, and the columns each question reads
+# (None means the question needs every column).
+SCHEMAS = {
+    "titanic": {
+        "dtype": {
+            "PassengerId": "int32",
+            "Parch": "int8",
+            "Sex": "category",
+            "Embarked": "category",
+        },
+        "read_options": {"index_col": 0},
+        "index_column": "Unnamed: 0",
+        "columns": {
+            "Q1": ["PassengerId"],
+            "Q2": None,
+            "Q3": ["Survived"],
+            "Q4": ["Fare"],
+            "Q5": ["Age"],
+            "Q6": ["Embarked"],
+            "Q7": ["Survived"],
+        },
+    },
+}
+
+datastore.register(SCHEMAS)
@@ -1,14 +1,32 @@
-import pandas as pd
+import cleaning
+import dataset
+import grader
+import student
 from student import *
 
 
+def load(questions):
+    return dataset.load_csv(
+        "./titanic_to_student.csv", schema="titanic", questions=questions
+    )
+
+
+def answer(df, question):
+    # Give each question a copy-on-write view, so one answer cannot affect the next
+    # and only the columns a question modifies are ever copied.
+    df = df.copy(deep=False)
+    if question == "Q7":
+        df = cleaning.MeanModeImputer(impute_categorical=False).fit(df).transform(df)
+    return f"Your Answer: {globals()[question](df)}"
+
+
 def main():
-    input_string = input('Question Input (ex."Q1") : ').strip()
-    df = pd.read_csv("./titanic_to_student.csv", index_col=0)
-    if input_string == "Q7":
-        df.fillna(df.select_dtypes(include="number").mean(), inplace=True)
-    input_command = f"{input_string}(df)"
-    print(f"Your Answer: {eval(input_command)}")
+    grader.run(
+        load,
+        answer,
+        grader.find_questions(student),
+        prompt='Question Input (ex."Q1") : ',
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+"""
+    COLUMN PROFILER:
+    Describe every column of a DataFrame in one pass: row and missing counts,
+    cardinality, the frequency of the most common value, and the mean and
+    selected quantiles of numeric columns.
+    Value frequencies come from category codes or pd.factorize codes counted with
+    np.bincount, so no per-column value_counts (and its sort) is needed, and the numeric
+    statistics are computed for all numeric columns in one call.
+    Drop-column decisions (too many missing values, too flat) read the profile.
+"""
+
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def quantile_name(q):
+    """
+    Name of the profile column of a quantile.
+
+    Args:
+        q (float): Quantile, between 0 and 1
+
+    Returns:
+        string: Column name, e.g. "q0.25"
+    """
+    return f"q{q:g}"
+
+
+def profile(df, quantiles=DEFAULT_QUANTILES):
+    """
+    Profile every column of a DataFrame.
+
+    Args:
+        df (DataFrame): Data to profile
+        quantiles (tuple): Quantiles computed for numeric columns
+
+    Returns:
+        DataFrame: One row per column of df, with the columns
+            count: non-missing values
+            missing: missing values
+            missing_ratio: missing / rows
+            cardinality: distinct non-missing values
+            top_count: count of the most common non-missing value
+            top_ratio: top_count / count (as value_counts(normalize=True).max())
+            flat_ratio: frequency of the most common value when missing values also
+                count as a value (as value_counts(normalize=True, dropna=False).max())
+            mean and one column per quantile: numeric columns only (NaN otherwise)
+    """
+    n_rows = len(df)
+    stats = {
+        "count": [],
+        "missing": [],
+        "cardinality": [],
+        "top_count": [],
+    }
+    for col in df.columns:
+        # Categorical columns are already coded; other columns are factorized.
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            n_codes = len(values.cat.categories)
+        else:
+            codes, uniques = pd.factorize(values)
+            n_codes = len(uniques)
+
+        # Code -1 marks a missing value, so shifting by one puts the missing count first.
+        counts = np.bincount(codes.astype(np.intp) + 1, minlength=n_codes + 1)
+        value_counts = counts[1:]
+
+        stats["missing"].append(int(counts[0]))
+        stats["count"].append(n_rows - int(counts[0]))
+        stats["cardinality"].append(int(np.count_nonzero(value_counts)))
+        stats["top_count"].append(int(value_counts.max()) if n_codes else 0)
+
+    result = pd.DataFrame(stats, index=df.columns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["missing_ratio"] = result["missing"] / n_rows
+        result["top_ratio"] = result["top_count"] / result["count"].replace(0, np.nan)
+        result["flat_ratio"] = result[["top_count", "missing"]].max(axis=1) / n_rows
+
+    # Numeric statistics of every numeric column at once.
+    numeric_df = df.select_dtypes(include="number")
+    result["mean"] = numeric_df.mean()
+    if len(quantiles) > 0:
+        numeric_quantiles = numeric_df.quantile(list(quantiles))
+        for q in quantiles:
+            result[quantile_name(q)] = numeric_quantiles.loc[q]
+
+    return result
@@ -0,0 +1,158 @@
+import math
+import numpy as np
+import pandas as pd
+
+"""
+    STRATIFIED SPLITS:
+    A stratified train/test split that only returns row positions, so a question
+    reads the labels it needs and takes the feature columns it needs, instead of
+    building four new DataFrames like train_test_split(X, y, stratify=y).
+    The positions are the same as those of train_test_split (and
+    StratifiedShuffleSplit) for the same test_size and random_state: the random
+    draws are made in the same order from the same RandomState.
+"""
+
+
+def split_sizes(n_samples, test_size, train_size=None):
+    """
+    Number of train and test rows, rounded like train_test_split.
+
+    Args:
+        n_samples (int): Number of rows
+        test_size (float or int): Test fraction, or number of test rows
+        train_size (float or int): Train fraction or rows, the complement when None
+
+    Returns:
+        tuple: (number of train rows, number of test rows)
+    """
+    if isinstance(test_size, float):
+        n_test = math.ceil(test_size * n_samples)
+    else:
+        n_test = int(test_size)
+
+    if train_size is None:
+        n_train = n_samples - n_test
+    elif isinstance(train_size, float):
+        n_train = math.floor(train_size * n_samples)
+    else:
+        n_train = int(train_size)
+
+    if n_train <= 0 or n_test <= 0 or n_train + n_test > n_samples:
+        raise ValueError(
+            f"Cannot split {n_samples} rows into {n_train} train and {n_test} test rows"
+        )
+    return n_train, n_test
+
+
+def allocate(class_counts, n_draws, rng):
+    """
+    Number of rows drawn from each class: the proportional share rounded down, then
+    one more row for the classes with the largest remainders (ties broken at random).
+
+    Args:
+        class_counts (ndarray): Rows per class
+        n_draws (int): Rows to draw in total
+        rng (RandomState): Random state used to break ties
+
+    Returns:
+        ndarray: Rows drawn from each class, summing to n_draws
+    """
+    continuous = class_counts / class_counts.sum() * n_draws
+    floored = np.floor(continuous)
+    need_to_add = int(n_draws - floored.sum())
+    if need_to_add > 0:
+        remainder = continuous - floored
+        for value in np.sort(np.unique(remainder))[::-1]:
+            (ties,) = np.where(remainder == value)
+            add_now = min(len(ties), need_to_add)
+            floored[rng.choice(ties, size=add_now, replace=False)] += 1
+            need_to_add -= add_now
+            if need_to_add == 0:
+                break
+    return floored.astype(int)
+
+
+def ragged_range(lengths):
+    """
+    Concatenated ranges 0 .. length - 1 of several lengths.
+
+    Args:
+        lengths (ndarray): Length of every range
+
+    Returns:
+        ndarray: e.g. [0, 1, 2, 0, 1] for the lengths [3, 2]
+    """
+    total = int(lengths.sum())
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(total) - starts
+
+
+def stratified_split(y, test_size, random_state=None, train_size=None):
+    """
+    Split rows into train and test positions while keeping the class proportions of y.
+
+    Args:
+        y (array-like): Class labels, one per row
+        test_size (float or int): Test fraction, or number of test rows
+        random_state (int): Seed
+        train_size (float or int): Train fraction or rows, the complement when None
+
+    Returns:
+        tuple: (train positions, test positions) as int arrays, in the same order
+            as the rows of train_test_split(..., stratify=y)
+    """
+    # Sorted class codes, like np.unique(y, return_inverse=True).
+    codes, classes = pd.factorize(np.asarray(y), sort=True)
+    if (codes < 0).any():
+        raise ValueError("Cannot stratify on missing labels")
+    class_counts = np.bincount(codes, minlength=len(classes))
+    if class_counts.min() < 2:
+        too_few = classes[class_counts < 2].tolist()
+        raise ValueError(f"Classes with fewer than 2 rows cannot be split: {too_few}")
+
+    n_train, n_test = split_sizes(len(codes), test_size, train_size)
+    if min(n_train, n_test) < len(classes):
+        raise ValueError(
+            f"Both splits need at least one row of each of the {len(classes)} classes"
+        )
+
+    # Positions of every class, in row order.
+    order = np.argsort(codes, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(class_counts)[:-1]])
+
+    rng = np.random.RandomState(random_state)
+    n_train_class = allocate(class_counts, n_train, rng)
+    n_test_class = allocate(class_counts - n_train_class, n_test, rng)
+
+    # One permutation per class, drawn in class order; the train rows of a class
+    # are the start of its permutation and its test rows come right after.
+    permuted = np.concatenate(
+        [
+            order[start + rng.permutation(count)]
+            for start, count in zip(starts, class_counts)
+        ]
+    )
+    offsets = starts[np.repeat(np.arange(len(classes)), n_train_class)]
+    train = permuted[offsets + ragged_range(n_train_class)]
+    offsets = starts[np.repeat(np.arange(len(classes)), n_test_class)]
+    test = permuted[
+        offsets + np.repeat(n_train_class, n_test_class) + ragged_range(n_test_class)
+    ]
+
+    return rng.permutation(train), rng.permutation(test)
+
+
+def take(data, rows):
+    """
+    Rows of a pandas object or of an array-like matrix at positions.
+
+    Args:
+        data (DataFrame, Series, ndarray or sparse matrix): Rows to take from
+        rows (ndarray): Row positions
+
+    Returns:
+        DataFrame, Series, ndarray or sparse matrix: Selected rows, in the order of rows
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.take(rows)
+    return data[rows]
@@ -1,5 +1,7 @@
 import pandas as pd
-from sklearn.model_selection import train_test_split
+import cleaning
+import profiler
+import splits
 
 """
     ASSIGNMENT 2 (STUDENT VERSION):
@@ -25,45 +27,29 @@ def Q2(df):
         Note:
         - Ensure missing values are considered in your calculation. If you use normalize in .value_counts(), please include dropna=False.
     """
-    # Create a deep copy of the DataFrame
-    cleaned_df = df.copy()
+    # Profile every column in one pass (missing values and most common value counts).
+    column_profile = profiler.profile(df, quantiles=())
 
     # Calculate amount of rows
-    dataset_rows = cleaned_df.shape[0]
-
-    # Calculate drop threshold
-    drop_threshold = 0.5 * dataset_rows
+    dataset_rows = df.shape[0]
 
     # Drop columns with missing value more than 50%
-    cleaned_df.dropna(axis=1, thresh=drop_threshold, inplace=True)
+    # (keep the columns with at least 50% of the rows filled, as dropna(thresh=...) does).
+    column_profile = column_profile[column_profile["count"] >= 0.5 * dataset_rows]
 
     # Ignore these columns
     IGNORE_COLUMNS = ("Age", "Fare")
 
-    # Initialize a list to store names to drop.
-    drop_columns = []
-
-    # Calculate drop threshold
-    drop_threshold = 0.7 * dataset_rows
-
-    # Iterate each columns
-    for column_name in cleaned_df.columns:
-        # Skip the ignored columns.
-        if column_name in IGNORE_COLUMNS:
-            continue
+    # Count of the most common value of each column, missing values included (value_counts(dropna=False)).
+    highest_count = column_profile[["top_count", "missing"]].max(axis=1)
 
-        # Calculate the highest count of the current columns.
-        highest_count = cleaned_df[column_name].value_counts(dropna=False).iloc[0]
-
-        # If the count exceeds the threshold, append the column name to a list.
-        if highest_count > drop_threshold:
-            drop_columns.append(column_name)
-
-    # Drop columns from the list.
-    cleaned_df.drop(columns=drop_columns, inplace=True)
+    # Drop the other columns where that count exceeds 70% of the rows.
+    FLAT_CONDITIONS = (highest_count > 0.7 * dataset_rows) & (
+        ~column_profile.index.isin(IGNORE_COLUMNS)
+    )
 
     # Return remaining columns amount.
-    return cleaned_df.shape[1]
+    return int((~FLAT_CONDITIONS).sum())
 
 
 def Q3(df):
@@ -86,27 +72,11 @@ def Q4(df):
         What is the mean of “Fare” after replacing the outliers (round 2 decimal points)?
         Hint: Use function round(_, 2)
     """
-    # Calculate quantile
-    q1 = df["Fare"].quantile(0.25)
-    q3 = df["Fare"].quantile(0.75)
+    # Learn the outlier boundaries of Fare (Q1 - 1.5IQR and Q3 + 1.5IQR) once.
+    clipper = cleaning.IQRClipper(columns=["Fare"], factor=1.5).fit(df)
 
-    # Calculate IQR
-    iqr = q3 - q1
-
-    # Calculate lower bound and upper bound.
-    lower_bound = q1 - (1.5 * iqr)
-    upper_bound = q3 + (1.5 * iqr)
-
-    # Create a deep copy of a DataFrame
-    cleaned_df = df.copy()
-
-    # Handle low outlier.
-    low_outlier_rows = cleaned_df["Fare"] < lower_bound
-    cleaned_df.loc[low_outlier_rows, "Fare"] = lower_bound
-
-    # Handle high outlier
-    high_outlier_rows = cleaned_df["Fare"] > upper_bound
-    cleaned_df.loc[high_outlier_rows, "Fare"] = upper_bound
+    # Replace the low and high outliers with the boundary values.
+    cleaned_df = clipper.transform(df)
 
     # Return new mean value of Fare column
     mean_fare = cleaned_df["Fare"].mean()
@@ -121,14 +91,9 @@ def Q5(df):
         What is the average (mean) of “Age” after imputing the missing values (round 2 decimal points)?
         Hint: Use function round(_, 2)
     """
-    # Calculate average age.
-    average_age = df["Age"].mean()
-
-    # Create a deep copy of a DataFrame
-    cleaned_df = df.copy()
-
-    # Impute missing value by average age.
-    cleaned_df["Age"].fillna(average_age)
+    # Learn the mean of every number type column, then impute the missing values with it.
+    imputer = cleaning.MeanModeImputer(impute_categorical=False).fit(df)
+    cleaned_df = imputer.transform(df)
 
     # Return new average age.
     average_age = cleaned_df["Age"].mean()
@@ -143,8 +108,9 @@ def Q6(df):
         What is the average (mean) of “Embarked_Q” after performing dummy coding (round 2 decimal points)?
         Hint: Use function round(_, 2)
     """
-    # Perform one-hot encoding
-    one_hot_df = pd.get_dummies(df["Embarked"], prefix="Embarked")
+    # Perform one-hot encoding with the category set of Embarked fixed at fit time.
+    encoder = cleaning.DummyEncoder(columns=["Embarked"]).fit(df)
+    one_hot_df = encoder.transform(df)
 
     # Return the mean of Embarked_Q column
     mean_embarked_q = one_hot_df["Embarked_Q"].mean()
@@ -160,14 +126,15 @@ def Q7(df):
         Hint: Use function round(_, 2), and train_test_split() from sklearn.model_selection,
         Don't forget to impute missing values with mean.
     """
-    # Separate features and targets from a dataset.
-    features = df.drop(columns=["Survived"])
+    # Only the target is needed, so split row positions instead of the features.
     target = df["Survived"]
 
     # Separate train dataset and test dataset by ratio 7:3 by using stratification.
-    features_train, features_test, target_train, target_test = train_test_split(
-        features, target, test_size=0.3, random_state=123, stratify=target
+    # (The same rows as train_test_split(..., random_state=123, stratify=target).)
+    train_rows, _ = splits.stratified_split(
+        target, test_size=0.3, random_state=123
     )
+    target_train = target.iloc[train_rows]
 
     # Calculate the proportion of survivors in the train dataset.
     train_dataset_rows = target_train.shape[0]
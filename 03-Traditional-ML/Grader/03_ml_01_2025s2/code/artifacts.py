@@ -0,0 +1,237 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from compiled_forest import CompiledForest
+
+"""
+    MODEL ARTIFACTS:
+    A fitted model is saved once with everything needed to score new rows: the
+    imputation values, the fitted encoder (its column layout) and the estimator.
+    The artifact name is the fingerprint of the training data plus a hash of the
+    parameters, so the same data and parameters always map to the same file, and
+    grading again (or scoring ad hoc) loads the model instead of training it again.
+    Artifacts are uncompressed joblib files, read in full: joblib could memory-map
+    their NumPy arrays, but scikit-learn copies the node arrays of every tree when it
+    unpickles it (Tree.__setstate__), so a mapping only adds page faults.
+    The artifact is a cache: an artifact that cannot be written or read again is
+    a cache miss, and the model is trained again.
+    A random forest is compiled (compiled_forest.py) whenever its artifact is built
+    or loaded, and predict_batch() scores with the compiled forest, whose predictions
+    are bit-identical to RandomForestClassifier.predict. Compiling takes a few
+    milliseconds, so the compiled arrays are not written to the artifact file.
+"""
+
+ARTIFACT_DIR = "models"
+ARTIFACT_SUFFIX = ".joblib"
+COMPILED_KEY = "compiled"
+BATCH_SIZE = 100_000
+
+
+def artifact_path(cache_dir, data_fingerprint, params):
+    """
+    Path of the artifact of a model trained on some data with some parameters.
+
+    Args:
+        cache_dir (string): Cache directory
+        data_fingerprint (string): Hex digest of the training data
+        params (dict): Model parameters
+
+    Returns:
+        string: <cache_dir>/models/<data fingerprint>-<parameters hash>.joblib
+    """
+    params_hash = hashlib.blake2b(
+        json.dumps(params, sort_keys=True, default=str).encode(), digest_size=8
+    ).hexdigest()
+    filename = f"{data_fingerprint}-{params_hash}{ARTIFACT_SUFFIX}"
+    return os.path.join(cache_dir, ARTIFACT_DIR, filename)
+
+
+def compile_model(model):
+    """
+    Compile a fitted model for scoring, when it is a single-output random forest.
+
+    Args:
+        model (estimator): Fitted estimator
+
+    Returns:
+        CompiledForest: Compiled forest, or None for other models
+    """
+    if isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1:
+        return CompiledForest(model)
+    return None
+
+
+def build(model, encoder, fill_values, params, data_fingerprint):
+    """
+    Gather a fitted model and its preprocessing into an artifact.
+
+    Args:
+        model (estimator): Fitted estimator
+        encoder (OneHotEncoder): Fitted encoder of the features
+        fill_values (dict): Value that replaces a missing value, per column
+        params (dict): Model parameters
+        data_fingerprint (string): Hex digest of the training data
+
+    Returns:
+        dict: model, encoder, fill_values, params, data_fingerprint
+            and the compiled model (None when it cannot be compiled)
+    """
+    return {
+        "model": model,
+        "encoder": encoder,
+        "fill_values": fill_values,
+        "params": params,
+        "data_fingerprint": data_fingerprint,
+        COMPILED_KEY: compile_model(model),
+    }
+
+
+def save(path, artifact):
+    """
+    Save a model artifact atomically.
+    A read-only cache directory (or a full disk) only costs the cache.
+
+    Args:
+        path (string): Artifact path
+        artifact (dict): Artifact created by build()
+
+    Returns:
+        bool: True when the artifact was written
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored = {key: value for key, value in artifact.items() if key != COMPILED_KEY}
+        joblib.dump(stored, temp_path)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+def load(path, mmap=False):
+    """
+    Load a model artifact.
+
+    Args:
+        path (string): Artifact path
+        mmap (bool): Memory-map the arrays instead of reading them into memory
+
+    Returns:
+        dict: model, encoder, fill_values, params, data_fingerprint
+            and the compiled model (None when it cannot be compiled)
+    """
+    artifact = joblib.load(path, mmap_mode="r" if mmap else None)
+    artifact[COMPILED_KEY] = compile_model(artifact["model"])
+    return artifact
+
+
+def load_cached(path):
+    """
+    Load a model artifact saved before, if there is a readable one.
+
+    Args:
+        path (string): Artifact path
+
+    Returns:
+        dict: Loaded artifact, or None when it is missing, truncated or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        return load(path)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+
+
+def prepare(artifact, df):
+    """
+    Impute and encode rows exactly like the training data.
+
+    Args:
+        artifact (dict): Loaded artifact
+        df (DataFrame): Raw rows with the training columns
+
+    Returns:
+        DataFrame or csr_matrix: Encoded features
+    """
+    encoder = artifact["encoder"]
+    df = df[[*encoder.passthrough_, *encoder.columns]]
+    df = df.fillna(artifact["fill_values"])
+    return encoder.transform(df)
+
+
+def predict_batch(artifact, data, batch_size=BATCH_SIZE):
+    """
+    Score new rows with a saved model, one vectorized batch at a time.
+
+    Args:
+        artifact (string or dict): Artifact path, or an artifact loaded with load()
+        data (string or DataFrame): CSV path or raw rows
+        batch_size (int): Rows per batch
+
+    Returns:
+        ndarray: Predicted label of every row
+    """
+    if isinstance(artifact, str):
+        artifact = load(artifact)
+
+    # A compiled forest predicts the same labels as the estimator, faster.
+    model = artifact.get(COMPILED_KEY)
+    if model is None:
+        model = artifact["model"]
+
+    if isinstance(data, pd.DataFrame):
+        batches = (
+            data.iloc[start : start + batch_size]
+            for start in range(0, len(data), batch_size)
+        )
+    else:
+        # Only the training columns are read; nominal values stay strings.
+        encoder = artifact["encoder"]
+        batches = pd.read_csv(
+            data,
+            usecols=[*encoder.passthrough_, *encoder.columns],
+            dtype={col: str for col in encoder.columns},
+            chunksize=batch_size,
+        )
+
+    predictions = [model.predict(prepare(artifact, batch)) for batch in batches]
+    if not predictions:
+        return np.empty(0, dtype=model.classes_.dtype)
+    return np.concatenate(predictions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV with a saved model.")
+    parser.add_argument("artifact", help="artifact saved by MushroomClassifier.Q5")
+    parser.add_argument("path", help="CSV of the rows to score")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--output", default=None, help="optional CSV of predictions")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    artifact = load(args.artifact)
+    loaded = time.perf_counter()
+    predictions = predict_batch(artifact, args.path, args.batch_size)
+    scored = time.perf_counter()
+
+    print(
+        f"{len(predictions)} rows, load {(loaded - start) * 1000:.1f} ms,"
+        f" scoring {(scored - loaded) * 1000:.1f} ms"
+    )
+    if args.output is not None:
+        pd.DataFrame({"prediction": predictions}).to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
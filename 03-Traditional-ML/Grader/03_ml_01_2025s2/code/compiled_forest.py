@@ -0,0 +1,374 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+"""
+    COMPILED FOREST:
+    Random forest inference on flat NumPy arrays, bit-identical to
+    RandomForestClassifier.predict_proba and predict.
+    The nodes of every tree are concatenated into contiguous arrays (feature,
+    threshold, left and right child, class fractions). A batch is evaluated for all
+    trees at once, one tree level per vectorized step: every (tree, row) pair moves
+    from its node to a child, and leaves point to themselves so pairs that reached a
+    shallow leaf stay there.
+    Shallow trees (at most 8 split nodes, e.g. max_depth <= 3) are compiled further:
+    the distinct split tests of the whole forest are evaluated once per row, one
+    small matrix product packs the test results of each tree into a code, and the
+    code indexes a per-tree table of leaf values, so a batch needs no per-node work.
+    Exactness: features are compared as float32 (sklearn's input type) against the
+    thresholds, missing values follow the learned missing-value direction, and the
+    leaf fractions are summed in tree order and divided by the number of trees, the
+    same operations as predict_proba with n_jobs=None.
+    Model artifacts (artifacts.py) compile their forest when they are built or
+    loaded, so predict_batch(), the predictor() of MushroomClassifier and the
+    prediction server all score with it.
+"""
+
+CHUNK_ROWS = 1_024
+MAX_TABLE_BITS = 8
+BATCH_SIZES = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def float32_floor(values):
+    """
+    Largest float32 values that are not above float64 values, so that for a float32 x
+    "x <= threshold" and "x <= float32_floor(threshold)" always agree.
+
+    Args:
+        values (ndarray): float64 thresholds
+
+    Returns:
+        ndarray: float32 thresholds
+    """
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledForest:
+    def __init__(self, model):
+        """
+        Class constructor method.
+
+        Args:
+            model (RandomForestClassifier): Fitted single-output forest
+        """
+        if model.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        # Initialization attributes
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+
+        # Additional attributes
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        n_nodes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(n_nodes)[:-1]])
+
+        self.n_trees = len(trees)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.roots = offsets.astype(np.intp)
+
+        # Leaves have no children (-1) and loop back to themselves.
+        lefts, rights = [], []
+        for tree, offset in zip(trees, offsets):
+            own = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left < 0
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+        self.feature = np.concatenate(
+            [np.maximum(tree.feature, 0) for tree in trees]
+        ).astype(np.intp)
+        self.threshold = float32_floor(
+            np.concatenate([tree.threshold for tree in trees])
+        )
+        self.missing_go_to_left = np.concatenate(
+            [tree.missing_go_to_left for tree in trees]
+        ).astype(bool)
+
+        # Class fractions of every node, one contiguous array per class.
+        n_classes = len(self.classes_)
+        value = np.concatenate([tree.value[:, 0, :n_classes] for tree in trees])
+        self.value = [
+            np.ascontiguousarray(value[:, k], dtype=np.float64)
+            for k in range(n_classes)
+        ]
+
+        # Leaf tables, only when every tree is small enough.
+        self.n_table_bits = max(
+            int(np.count_nonzero(tree.children_left >= 0)) for tree in trees
+        )
+        self.compiled = self.n_table_bits <= MAX_TABLE_BITS
+        if self.compiled:
+            self._compile_tables()
+
+    def _compile_tables(self):
+        """
+        Build the distinct split tests, the test-to-code weights of every tree
+        and the leaf value table of every tree.
+        """
+        n_codes = 1 << self.n_table_bits
+        split = ~self.is_leaf
+
+        # Every split node is one (feature, threshold, missing direction) test.
+        # (float32 thresholds and small integers are exact as float64 keys.)
+        tests = np.stack(
+            [
+                self.feature[split],
+                self.threshold[split],
+                self.missing_go_to_left[split],
+            ],
+            axis=1,
+        ).astype(np.float64)
+        unique_tests, test_ids = np.unique(tests, axis=0, return_inverse=True)
+        test_ids = test_ids.ravel()
+        self.test_feature = unique_tests[:, 0].astype(np.intp)
+        self.test_threshold = unique_tests[:, 1:2].astype(np.float32)
+        self.test_missing_left = unique_tests[:, 2:3].astype(bool)
+
+        # Split node k of a tree sets bit k of the tree code; a test shared by several
+        # split nodes of a tree sets all their bits. The codes are small integers,
+        # so the float32 product is exact.
+        node_tree = np.repeat(
+            np.arange(self.n_trees), np.diff(np.append(self.roots, len(self.left)))
+        )
+        split_tree = node_tree[split]
+        split_starts = np.searchsorted(split_tree, np.arange(self.n_trees))
+        split_bit = np.arange(len(split_tree)) - split_starts[split_tree]
+        self.test_weights = np.zeros(
+            (self.n_trees, len(unique_tests)), dtype=np.float32
+        )
+        np.add.at(self.test_weights, (split_tree, test_ids), np.float32(2) ** split_bit)
+
+        # Leaf of every (tree, code): walk each tree with the bits of the code.
+        node_bit = np.zeros(len(self.left), dtype=np.intp)
+        node_bit[split] = split_bit
+        codes = np.arange(n_codes)[None, :]
+        nodes = np.repeat(self.roots[:, None], n_codes, axis=1)
+        for _ in range(self.max_depth):
+            go_left = (codes >> node_bit[nodes]) & 1 == 1
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        self.table_offsets = (np.arange(self.n_trees) * n_codes)[:, None]
+        self.leaf_tables = [value[nodes].ravel() for value in self.value]
+
+    def _as_float32(self, X):
+        """
+        Convert features to a dense float32 array, like sklearn's input validation.
+
+        Args:
+            X (DataFrame, ndarray or sparse matrix): Features
+
+        Returns:
+            ndarray: float32 array
+        """
+        if scipy.sparse.issparse(X):
+            X = X.toarray()
+        X = np.asarray(X).astype(np.float32, copy=False)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X must have {self.n_features_in_} features, got shape {X.shape}"
+            )
+        return X
+
+    def _traverse(self, X):
+        """
+        Leaf of every (tree, row) pair, one tree level per step.
+
+        Args:
+            X (ndarray): float32 features
+
+        Returns:
+            ndarray: Global leaf indices, of shape (trees, rows)
+        """
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        row_starts = np.arange(n_rows) * n_features
+        has_missing = bool(np.isnan(X).any())
+
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            values = flat[row_starts + self.feature[nodes]]
+            go_left = values <= self.threshold[nodes]
+            if has_missing:
+                go_left |= np.isnan(values) & self.missing_go_to_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _table_index(self, X):
+        """
+        Leaf table position of every (tree, row) pair.
+
+        Args:
+            X (ndarray): float32 features
+
+        Returns:
+            ndarray: Positions in the leaf tables, of shape (trees, rows)
+        """
+        columns = np.ascontiguousarray(X.T)[self.test_feature]
+        passed = columns <= self.test_threshold
+        if np.isnan(columns).any():
+            passed |= np.isnan(columns) & self.test_missing_left
+        codes = self.test_weights @ passed.astype(np.float32)
+        return self.table_offsets + codes.astype(np.intp)
+
+    def apply(self, X):
+        """
+        Leaf of every row in every tree.
+
+        Args:
+            X (DataFrame, ndarray or sparse matrix): Features
+
+        Returns:
+            ndarray: Global leaf indices, of shape (rows, trees)
+        """
+        n_rows = X.shape[0]
+        leaves = np.empty((n_rows, self.n_trees), dtype=np.intp)
+        for start in range(0, n_rows, CHUNK_ROWS):
+            chunk = self._as_float32(X[start : start + CHUNK_ROWS])
+            leaves[start : start + CHUNK_ROWS] = self._traverse(chunk).T
+        return leaves
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, bit-identical to RandomForestClassifier.predict_proba.
+
+        Args:
+            X (DataFrame, ndarray or sparse matrix): Features
+
+        Returns:
+            ndarray: Probabilities of shape (rows, classes), in classes_ order
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X.to_numpy()
+
+        n_rows = X.shape[0]
+        proba = np.empty((n_rows, len(self.classes_)), dtype=np.float64)
+        for start in range(0, n_rows, CHUNK_ROWS):
+            chunk = self._as_float32(X[start : start + CHUNK_ROWS])
+            if self.compiled:
+                index, values = self._table_index(chunk), self.leaf_tables
+            else:
+                index, values = self._traverse(chunk), self.value
+
+            # Reducing over the first (tree) axis adds the trees one after the other,
+            # in the order sklearn adds them.
+            for k, class_values in enumerate(values):
+                proba[start : start + CHUNK_ROWS, k] = np.add.reduce(
+                    class_values[index], axis=0
+                )
+
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X):
+        """
+        Predicted classes, identical to RandomForestClassifier.predict.
+
+        Args:
+            X (DataFrame, ndarray or sparse matrix): Features
+
+        Returns:
+            ndarray: Predicted labels
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def time_call(function, X, min_seconds=0.2):
+    """
+    Best wall time of a call, repeated until min_seconds has elapsed.
+
+    Args:
+        function (callable): Function of X
+        X (array-like): Input batch
+        min_seconds (float): Minimum total measuring time
+
+    Returns:
+        tuple: (best seconds per call, result of the last call)
+    """
+    best = float("inf")
+    total = 0.0
+    while total < min_seconds:
+        start = time.perf_counter()
+        result = function(X)
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+    return best, result
+
+
+def benchmark(model, X, batch_sizes=BATCH_SIZES, seed=0):
+    """
+    Compare RandomForestClassifier.predict_proba with the compiled forest
+    on batches of rows drawn from X.
+
+    Args:
+        model (RandomForestClassifier): Fitted forest
+        X (DataFrame, ndarray or sparse matrix): Rows to draw the batches from
+        batch_sizes (tuple): Batch sizes
+        seed (int): Seed of the row draw
+
+    Returns:
+        DataFrame: One row per batch size with both timings, the speedup,
+            and whether predict_proba and predict are bit-identical
+    """
+    compile_start = time.perf_counter()
+    compiled = CompiledForest(model)
+    compile_seconds = time.perf_counter() - compile_start
+    rng = np.random.default_rng(seed)
+
+    rows = []
+    for batch_size in batch_sizes:
+        positions = rng.integers(0, X.shape[0], batch_size)
+        batch = X.iloc[positions] if isinstance(X, pd.DataFrame) else X[positions]
+        sklearn_seconds, expected = time_call(model.predict_proba, batch)
+        compiled_seconds, actual = time_call(compiled.predict_proba, batch)
+        rows.append(
+            {
+                "batch_size": batch_size,
+                "sklearn_ms": sklearn_seconds * 1000,
+                "compiled_ms": compiled_seconds * 1000,
+                "speedup": sklearn_seconds / compiled_seconds,
+                "proba_identical": np.array_equal(expected, actual),
+                "predict_identical": np.array_equal(
+                    model.predict(batch), compiled.predict(batch)
+                ),
+            }
+        )
+
+    table = pd.DataFrame(rows).set_index("batch_size")
+    table.attrs["compile_ms"] = compile_seconds * 1000
+    table.attrs["compiled"] = compiled.compiled
+    return table
+
+
+def main():
+    import student
+
+    parser = argparse.ArgumentParser(description="Compiled forest benchmark.")
+    parser.add_argument("path", nargs="?", default="./mushroom2020_dataset.csv")
+    parser.add_argument("--max-batch", type=int, default=BATCH_SIZES[-1])
+    parser.add_argument("--sparse", action="store_true", help="CSR features")
+    args = parser.parse_args()
+
+    # The forest chosen by Q5 (loaded from its artifact when it was saved before).
+    classifier = student.MushroomClassifier(args.path, sparse=args.sparse)
+    classifier.Q5()
+    model = classifier.model.best_estimator_
+
+    batch_sizes = [size for size in BATCH_SIZES if size <= args.max_batch]
+    table = benchmark(model, classifier.X_test, batch_sizes)
+    engine = "leaf tables" if table.attrs["compiled"] else "level traversal"
+    print(f"compiled in {table.attrs['compile_ms']:.1f} ms ({engine})")
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
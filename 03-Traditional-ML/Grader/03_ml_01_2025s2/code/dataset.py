@@ -0,0 +1,54 @@
+import os
+import sys
+
+# The generic loader lives once in <repo>/common, shared by every grader folder.
+COMMON_DIR = os.path.realpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), *[os.pardir] * 4, "common")
+)
+if COMMON_DIR not in sys.path:
+    sys.path.insert(0, COMMON_DIR)
+
+import datastore
+from datastore import CACHE_DIR, SharedDataset, fingerprint, load_csv, release, shared
+
+"""
+    DATASET SCHEMAS:
+    The datasets of this grader folder: the dtypes they are parsed with and the
+    columns each question reads. The loader itself (columnar sidecar cache, shared
+    handles) is common/datastore.py, and the names used here are re-exported from it.
+"""
+
+# Dataset schemas: dtypes to parse with, and the columns each question reads
+# (None means the question needs every column).
+NOMINAL_COLUMNS = [
+    "cap-shape",
+    "cap-surface",
+    "bruises",
+    "odor",
+    "stalk-shape",
+    "ring-number",
+    "ring-type",
+    "spore-print-color",
+    "population",
+    "habitat",
+]
+
+SCHEMAS = {
+    "mushroom": {
+        "dtype": {
+            "id": "int32",
+            "gill-size": "category",
+            **{col: "category" for col in NOMINAL_COLUMNS},
+        },
+        "columns": {
+            "Q1": ["gill-size"],
+            "Q2": ["label", *NOMINAL_COLUMNS, "cap-color-rate"],
+            "Q3": ["label", *NOMINAL_COLUMNS, "cap-color-rate"],
+            "Q4": ["label", *NOMINAL_COLUMNS, "cap-color-rate"],
+            "Q5": ["label", *NOMINAL_COLUMNS, "cap-color-rate"],
+            "Q6": ["label", *NOMINAL_COLUMNS, "cap-color-rate"],
+        },
+    },
+}
+
+datastore.register(SCHEMAS)
@@ -0,0 +1,115 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import scipy.sparse
+import student
+
+"""
+    ENGINE BENCHMARK:
+    Compare the MushroomClassifier engines on the same data: the one-hot random forest
+    grid search and the gradient boosting model on category codes.
+    Every run works on a copy of the dataset in a fresh directory, so neither the
+    dataset sidecar nor the search and model caches make a run look faster.
+    Each engine is run twice: once untimed by tracemalloc for the fit time, and once
+    traced for the peak Python/NumPy allocation (worker processes of a parallel
+    search are not traced).
+"""
+
+
+def matrix_bytes(X):
+    """
+    Memory used by a feature matrix.
+
+    Args:
+        X (DataFrame, ndarray or sparse matrix): Features
+
+    Returns:
+        int: Bytes
+    """
+    if isinstance(X, pd.DataFrame):
+        return int(X.memory_usage(index=False, deep=True).sum())
+    if scipy.sparse.issparse(X):
+        return int(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes)
+    return int(np.asarray(X).nbytes)
+
+
+def run_engine(data_path, engine, trace_memory=False, **options):
+    """
+    Encode, fit and score one engine on a fresh copy of the dataset.
+
+    Args:
+        data_path (string): CSV dataset path
+        engine (string): MushroomClassifier engine
+        trace_memory (bool): Trace the peak allocation of encoding and fitting
+        **options: Other MushroomClassifier arguments
+
+    Returns:
+        dict: Fit seconds (Q4 and Q5), peak bytes (when traced), feature matrix
+            bytes and columns, Q5 answer and Q6 per-class F1
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = shutil.copy(data_path, os.path.join(directory, "data.csv"))
+        classifier = student.MushroomClassifier(path, engine=engine, **options)
+        classifier.Q3()
+
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        classifier.Q4()
+        q5 = classifier.Q5()
+        fit_seconds = time.perf_counter() - start
+        peak_bytes = None
+        if trace_memory:
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        return {
+            "engine": engine,
+            "fit_seconds": fit_seconds,
+            "peak_bytes": peak_bytes,
+            "feature_bytes": matrix_bytes(classifier.X_train),
+            "n_features": classifier.X_train.shape[1],
+            "q5": q5,
+            "f1": classifier.Q6(),
+        }
+
+
+def benchmark(data_path, engines=student.ENGINES, **options):
+    """
+    Run every engine, untraced for time and traced for memory.
+
+    Args:
+        data_path (string): CSV dataset path
+        engines (tuple): Engines to compare
+        **options: Other MushroomClassifier arguments
+
+    Returns:
+        DataFrame: One row per engine
+    """
+    rows = []
+    for engine in engines:
+        row = run_engine(data_path, engine, **options)
+        row["peak_bytes"] = run_engine(data_path, engine, True, **options)["peak_bytes"]
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("engine")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MushroomClassifier engines.")
+    parser.add_argument("path", nargs="?", default="./mushroom2020_dataset.csv")
+    parser.add_argument("--engines", nargs="+", default=list(student.ENGINES))
+    args = parser.parse_args()
+
+    table = benchmark(args.path, args.engines)
+    table["peak_mib"] = table.pop("peak_bytes") / 2**20
+    table["feature_mib"] = table.pop("feature_bytes") / 2**20
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+import hashlib
+import json
+import math
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import resample
+import splits
+
+"""
+    HYPERPARAMETER SEARCH:
+    A grid search whose per-(parameters, fold, data fingerprint) scores are kept on disk,
+    so re-running or extending a grid only fits the new cells. A cell is keyed by its
+    parameters, the parameters of the base estimator and the rows of its fold, so a
+    search with another base estimator or splitter never reuses its scores.
+    The cache is best effort: an unreadable or unwritable cache only costs the fits.
+    The exhaustive mode picks the same best_params_ as GridSearchCV, and the
+    successive halving mode evaluates every candidate on a small budget first
+    (fewer trees or fewer samples) and only keeps the best ones for larger budgets.
+"""
+
+SEARCH_MODES = ("grid", "halving")
+HALVING_RESOURCES = ("n_estimators", "n_samples")
+
+
+def data_fingerprint(X, y):
+    """
+    Hash the content of a training set.
+
+    Args:
+        X (DataFrame or sparse matrix): Features
+        y (Series): Targets
+
+    Returns:
+        string: Hex digest that changes whenever a value, column or row changes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if scipy.sparse.issparse(X):
+        # The CSR arrays (with sorted indices) identify the matrix.
+        X = scipy.sparse.csr_matrix(X)
+        X.sort_indices()
+        digest.update(json.dumps(["csr", *X.shape, str(X.dtype)]).encode())
+        for array in (X.indptr, X.indices, X.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+    else:
+        digest.update(json.dumps([str(col) for col in X.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def folds_fingerprint(folds):
+    """
+    Hash the row positions of cross-validation folds.
+
+    Args:
+        folds (list): (train, test) row positions of every fold
+
+    Returns:
+        string: Hex digest that changes whenever a fold gets other rows
+            (another splitter, shuffle or seed)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for train, test in folds:
+        for rows in (train, test):
+            digest.update(np.int64(len(rows)).tobytes())
+            digest.update(np.ascontiguousarray(rows, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def fit_and_score(estimator, params, X, y, train, test, scorer, n_samples, seed):
+    """
+    Fit one (parameters, fold) cell and score it on the held-out fold.
+
+    Args:
+        estimator (estimator): Unfitted base estimator
+        params (dict): Parameters of the cell
+        X (DataFrame or sparse matrix): Features
+        y (Series): Targets
+        train (ndarray): Training row positions of the fold
+        test (ndarray): Held-out row positions of the fold
+        scorer (callable): Scorer
+        n_samples (int): Training rows to subsample, or None to use the whole fold
+        seed (int): Subsampling seed
+
+    Returns:
+        float: Score on the held-out fold
+    """
+    if n_samples is not None and n_samples < len(train):
+        train = resample(
+            train,
+            replace=False,
+            n_samples=n_samples,
+            random_state=seed,
+            stratify=y.iloc[train],
+        )
+
+    model = clone(estimator).set_params(**params)
+    model.fit(splits.take(X, train), y.iloc[train])
+    return float(scorer(model, splits.take(X, test), y.iloc[test]))
+
+
+class CachedSearchCV:
+    def __init__(
+        self,
+        estimator,
+        param_grid,
+        cv=5,
+        scoring=None,
+        n_jobs=None,
+        search="grid",
+        resource="n_estimators",
+        factor=3,
+        cache_dir=None,
+        random_state=0,
+        refit=True,
+    ):
+        """
+        Class constructor method.
+
+        Args:
+            estimator (estimator): Base estimator
+            param_grid (dict): Parameter grid, as for GridSearchCV
+            cv (int): Number of cross-validation folds
+            scoring (string): Scorer name, as for GridSearchCV
+            n_jobs (int): Parallel fits of uncached cells
+            search (string): "grid" (exhaustive) or "halving" (successive halving)
+            resource (string): Halving budget, "n_estimators" or "n_samples"
+            factor (int): Fraction of candidates kept (1 / factor) per halving round
+            cache_dir (string): Directory of the score cache, no cache when None
+            random_state (int): Seed of the "n_samples" subsampling
+            refit (bool): Refit the best candidate on all data at the end of fit
+                (when False, best_estimator_ is left to the caller)
+        """
+        if search not in SEARCH_MODES:
+            raise ValueError(f"search must be one of {SEARCH_MODES}, got {search!r}")
+        if resource not in HALVING_RESOURCES:
+            raise ValueError(
+                f"resource must be one of {HALVING_RESOURCES}, got {resource!r}"
+            )
+
+        # Initialization attributes
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.search = search
+        self.resource = resource
+        self.factor = factor
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+        self.refit = refit
+
+        # Additional attributes
+        self.best_params_ = None
+        self.best_score_ = None
+        self.best_estimator_ = None
+        self.cv_results_ = None
+        self.n_fitted_cells_ = 0
+        self.n_cached_cells_ = 0
+
+    def fit(self, X, y):
+        """
+        Search the parameter grid, then refit the best candidate on all data.
+
+        Args:
+            X (DataFrame or sparse matrix): Training features
+            y (Series): Training targets
+
+        Returns:
+            CachedSearchCV: Fitted search
+        """
+        self._scorer = get_scorer(self.scoring)
+        self._folds = list(
+            check_cv(self.cv, y, classifier=is_classifier(self.estimator)).split(X, y)
+        )
+        self._cell_key = {
+            "estimator": type(self.estimator).__name__,
+            "estimator_params": self.estimator.get_params(),
+            "folds": folds_fingerprint(self._folds),
+            "n_folds": len(self._folds),
+            "scoring": str(self.scoring),
+        }
+        self._cache_path = None
+        self._cache = {}
+        if self.cache_dir is not None:
+            filename = f"search-{data_fingerprint(X, y)}.json"
+            self._cache_path = os.path.join(self.cache_dir, filename)
+            self._cache = self._load_cache()
+
+        self.n_fitted_cells_ = 0
+        self.n_cached_cells_ = 0
+        self.cv_results_ = {"params": [], "resource": [], "mean_test_score": []}
+
+        candidates = list(ParameterGrid(self.param_grid))
+        if self.search == "grid":
+            means = self._evaluate(X, y, candidates, resource=None)
+        else:
+            candidates, means = self._halving(X, y, candidates)
+
+        # Same choice as GridSearchCV: the first candidate with the best mean score.
+        best_index = int(np.argmax(means))
+        self.best_params_ = candidates[best_index]
+        self.best_score_ = float(means[best_index])
+
+        if self.refit:
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_)
+            self.best_estimator_.fit(X, y)
+        return self
+
+    def predict(self, X):
+        """
+        Predict with the refitted best estimator.
+
+        Args:
+            X (DataFrame): Features
+
+        Returns:
+            ndarray: Predicted labels
+        """
+        return self.best_estimator_.predict(X)
+
+    def _halving(self, X, y, candidates):
+        """
+        Successive halving: evaluate all candidates on a small budget,
+        keep the best 1 / factor of them and multiply the budget by factor.
+
+        Args:
+            X (DataFrame or sparse matrix): Training features
+            y (Series): Training targets
+            candidates (list): Parameter dicts
+
+        Returns:
+            tuple: Surviving candidates and their mean scores at the full budget
+        """
+        n_rounds = max(1, math.ceil(math.log(len(candidates), self.factor)) + 1)
+        if self.resource == "n_estimators":
+            max_resource = max(params.get("n_estimators", 100) for params in candidates)
+        else:
+            max_resource = min(len(train) for train, _ in self._folds)
+
+        for round_index in range(n_rounds):
+            # The last round always uses the full budget.
+            remaining_rounds = n_rounds - 1 - round_index
+            resource = max(1, max_resource // self.factor**remaining_rounds)
+            means = self._evaluate(X, y, candidates, resource)
+            if remaining_rounds == 0:
+                break
+
+            # Keep the best candidates; ties keep grid order.
+            n_keep = max(1, math.ceil(len(candidates) / self.factor))
+            order = np.argsort(-means, kind="stable")[:n_keep]
+            candidates = [candidates[i] for i in sorted(order)]
+
+        # The final candidates report the full budget in their parameters.
+        if self.resource == "n_estimators":
+            candidates = [
+                {**params, "n_estimators": max_resource} for params in candidates
+            ]
+        return candidates, means
+
+    def _evaluate(self, X, y, candidates, resource):
+        """
+        Compute the mean cross-validation score of candidates, fitting only uncached cells.
+
+        Args:
+            X (DataFrame or sparse matrix): Training features
+            y (Series): Training targets
+            candidates (list): Parameter dicts
+            resource (int): Halving budget, or None for the exhaustive search
+
+        Returns:
+            ndarray: Mean score of each candidate
+        """
+        cells = []
+        for params in candidates:
+            fit_params = dict(params)
+            n_samples = None
+            if resource is not None and self.resource == "n_estimators":
+                fit_params["n_estimators"] = resource
+            elif resource is not None:
+                n_samples = resource
+
+            for fold_index in range(len(self._folds)):
+                key = json.dumps(
+                    {
+                        **self._cell_key,
+                        "params": fit_params,
+                        "fold": fold_index,
+                        "n_samples": n_samples,
+                    },
+                    sort_keys=True,
+                    default=str,
+                )
+                cells.append((key, fit_params, fold_index, n_samples))
+
+        # Fit the cells that are not in the cache yet.
+        missing = [cell for cell in cells if cell[0] not in self._cache]
+        scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(fit_and_score)(
+                self.estimator,
+                fit_params,
+                X,
+                y,
+                *self._folds[fold_index],
+                self._scorer,
+                n_samples,
+                self.random_state,
+            )
+            for _, fit_params, fold_index, n_samples in missing
+        )
+        for (key, *_), score in zip(missing, scores):
+            self._cache[key] = score
+
+        self.n_fitted_cells_ += len(missing)
+        self.n_cached_cells_ += len(cells) - len(missing)
+        if missing:
+            self._save_cache()
+
+        # Average the fold scores of each candidate.
+        n_folds = len(self._folds)
+        fold_scores = np.array([self._cache[key] for key, *_ in cells])
+        means = fold_scores.reshape(len(candidates), n_folds).mean(axis=1)
+
+        self.cv_results_["params"].extend(candidates)
+        self.cv_results_["resource"].extend([resource] * len(candidates))
+        self.cv_results_["mean_test_score"].extend(means.tolist())
+        return means
+
+    def _load_cache(self):
+        """
+        Read the score cache.
+
+        Returns:
+            dict: Cell key mapped to its score, empty when the cache is missing
+                or unreadable
+        """
+        try:
+            with open(self._cache_path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        """
+        Write the score cache atomically.
+        A read-only cache directory only costs the cache, not the search.
+        """
+        if self._cache_path is None:
+            return
+
+        temp_path = f"{self._cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_path, "w") as file:
+                json.dump(self._cache, file)
+            os.replace(temp_path, self._cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
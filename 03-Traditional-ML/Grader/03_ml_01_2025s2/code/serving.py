@@ -0,0 +1,525 @@
+import argparse
+import collections
+import io
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+import student
+
+"""
+    PREDICTION SERVER:
+    Serve a fitted model of this folder over a local Unix socket. The model and its
+    preprocessing state are loaded once (the class predictor() method), then every
+    request is one line of JSON:
+        {"rows": [{"column": value, ...}, ...]}    rows as JSON records
+        {"csv": "column,...\\nvalue,...\\n"}        rows as CSV text with a header
+        {"stats": true}                           counters of the server
+    and every response is one line of JSON, {"predictions": [...]} or {"error": "..."}.
+    Concurrent requests are coalesced into micro-batches: a batch is closed when it
+    holds max_batch_size rows or when its first request has waited max_wait seconds,
+    and is scored with a single vectorized predict call.
+    Every request is checked on its own before it joins a batch: a request without
+    the model input columns (the class input_columns() method) is rejected alone,
+    and the others are projected on those columns, so concatenating them never fills
+    missing columns with NaN for the imputation to hide. If a batch still fails, its
+    requests are scored again one by one, so only the failing ones get the error.
+    The server counts requests, rows and batches, and keeps recent request latencies
+    for the p50 and p99. "bench" runs a local load generator against a server.
+"""
+
+MAX_BATCH_SIZE = 1024
+MAX_WAIT = 0.005
+LATENCY_WINDOW = 100_000
+
+
+def find_model():
+    """
+    Name of the class of this folder's student module that can serve predictions.
+
+    Returns:
+        string: Class name
+    """
+    for name, value in vars(student).items():
+        if isinstance(value, type) and hasattr(value, "predictor"):
+            return name
+    raise ValueError("The student module has no class with a predictor() method")
+
+
+def percentile_ms(latencies, q):
+    """
+    Percentile of latencies, in milliseconds.
+
+    Args:
+        latencies (iterable): Latencies in seconds
+        q (float): Percentile, between 0 and 100
+
+    Returns:
+        float: Percentile in milliseconds, NaN without latencies
+    """
+    latencies = np.fromiter(latencies, dtype=np.float64)
+    if len(latencies) == 0:
+        return float("nan")
+    return float(np.percentile(latencies, q) * 1000)
+
+
+class ServingStats:
+    def __init__(self, window=LATENCY_WINDOW):
+        """
+        Class constructor method.
+
+        Args:
+            window (int): Number of recent request latencies kept for the percentiles
+        """
+        # Initialization attributes
+        self.window = window
+
+        # Additional attributes
+        self.lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.n_requests = 0
+        self.n_rows = 0
+        self.n_batches = 0
+        self.n_errors = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def record_batch(self, latencies, n_rows, n_failed=0):
+        """
+        Count one scored batch.
+
+        Args:
+            latencies (list): Latency of every request of the batch, in seconds
+            n_rows (int): Rows of the batch
+            n_failed (int): Requests of the batch that got an error
+        """
+        with self.lock:
+            self.n_requests += len(latencies)
+            self.n_rows += n_rows
+            self.n_batches += 1
+            self.n_errors += n_failed
+            self.latencies.extend(latencies)
+
+    def record_rejected(self):
+        """
+        Count one request rejected before it joined a batch.
+        """
+        with self.lock:
+            self.n_requests += 1
+            self.n_errors += 1
+
+    def snapshot(self):
+        """
+        Current counters.
+
+        Returns:
+            dict: Requests, rows, batches and errors, rows and requests per second
+                since the start, mean batch rows, and p50 / p99 latency in milliseconds
+        """
+        with self.lock:
+            elapsed = time.perf_counter() - self.started_at
+            latencies = list(self.latencies)
+            return {
+                "requests": self.n_requests,
+                "rows": self.n_rows,
+                "batches": self.n_batches,
+                "errors": self.n_errors,
+                "rows_per_second": self.n_rows / elapsed,
+                "requests_per_second": self.n_requests / elapsed,
+                "mean_batch_rows": self.n_rows / max(self.n_batches, 1),
+                "p50_ms": percentile_ms(latencies, 50),
+                "p99_ms": percentile_ms(latencies, 99),
+            }
+
+
+class MicroBatcher:
+    def __init__(
+        self, predict, columns=None, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT
+    ):
+        """
+        Class constructor method.
+
+        Args:
+            predict (callable): Vectorized function from raw rows (DataFrame)
+                to one prediction per row
+            columns (list): Raw columns predict reads, every request must have them
+                (None accepts any rows as they are)
+            max_batch_size (int): Rows that close a batch
+            max_wait (float): Seconds the first request of a batch may wait
+        """
+        # Initialization attributes
+        self.predict = predict
+        self.columns = None if columns is None else list(columns)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        # Additional attributes
+        self.stats = ServingStats()
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def prepare(self, rows):
+        """
+        Check the rows of one request and keep the input columns, in model order.
+
+        Args:
+            rows (DataFrame): Raw rows
+
+        Returns:
+            DataFrame: Rows with exactly the input columns
+        """
+        if not isinstance(rows, pd.DataFrame):
+            raise TypeError(f"Rows must be a DataFrame, got {type(rows).__name__}")
+        if self.columns is None:
+            return rows
+
+        missing = [col for col in self.columns if col not in rows.columns]
+        if missing:
+            raise ValueError(f"Missing input columns: {missing}")
+        return rows[self.columns]
+
+    def submit(self, rows):
+        """
+        Queue rows for the next batch, or reject them alone if they are invalid.
+
+        Args:
+            rows (DataFrame): Raw rows
+
+        Returns:
+            Future: Resolves to the list of predictions of the rows
+        """
+        future = Future()
+        try:
+            rows = self.prepare(rows)
+        except Exception as error:
+            future.set_exception(error)
+            self.stats.record_rejected()
+            return future
+
+        self.requests.put((rows, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        """
+        Wait for a first request, then add requests until the batch is full
+        or the first request has waited max_wait (requests that are already
+        queued always join, even past the deadline).
+
+        Returns:
+            list: (rows, future, submitted at) of every request of the batch
+        """
+        batch = [self.requests.get()]
+        n_rows = len(batch[0][0])
+        deadline = batch[0][2] + self.max_wait
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                if timeout > 0:
+                    request = self.requests.get(timeout=timeout)
+                else:
+                    request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_rows += len(request[0])
+        return batch
+
+    def _score(self, frames):
+        """
+        Score the rows of several requests with one predict call.
+
+        Args:
+            frames (list): Prepared rows of every request
+
+        Returns:
+            list: Predictions of every request
+        """
+        predictions = np.asarray(self.predict(pd.concat(frames, ignore_index=True)))
+        ends = np.cumsum([len(rows) for rows in frames])
+        if len(predictions) != ends[-1]:
+            raise ValueError(f"{len(predictions)} predictions for {ends[-1]} rows")
+        return np.split(predictions, ends[:-1])
+
+    def _score_alone(self, rows):
+        """
+        Score the rows of one request after its batch failed.
+
+        Args:
+            rows (DataFrame): Prepared rows of the request
+
+        Returns:
+            ndarray or Exception: Predictions of the rows, or the error they raise
+        """
+        try:
+            return self._score([rows])[0]
+        except Exception as error:
+            return error
+
+    def _run(self):
+        """
+        Score batches forever (the worker thread).
+        """
+        while True:
+            batch = self._collect()
+            frames = [rows for rows, _, _ in batch]
+            try:
+                parts = self._score(frames)
+            except Exception as error:
+                # Score the requests alone, so only the failing ones get an error.
+                if len(batch) == 1:
+                    parts = [error]
+                else:
+                    parts = [self._score_alone(rows) for rows in frames]
+
+            # Hand every request its own slice of the batch predictions.
+            done = time.perf_counter()
+            n_failed = 0
+            for (_, future, _), part in zip(batch, parts):
+                if isinstance(part, Exception):
+                    future.set_exception(part)
+                    n_failed += 1
+                else:
+                    future.set_result(part.tolist())
+            self.stats.record_batch(
+                [done - submitted for _, _, submitted in batch],
+                sum(len(rows) for rows in frames),
+                n_failed,
+            )
+
+
+def parse_request(line):
+    """
+    Parse one request line.
+
+    Args:
+        line (string): JSON request
+
+    Returns:
+        DataFrame or None: Raw rows, None for a stats request
+    """
+    request = json.loads(line)
+    if request.get("stats"):
+        return None
+    if "rows" in request:
+        return pd.DataFrame.from_records(request["rows"])
+    if "csv" in request:
+        return pd.read_csv(io.StringIO(request["csv"]))
+    raise ValueError('A request needs "rows", "csv" or "stats"')
+
+
+def serve(batcher, socket_path):
+    """
+    Answer prediction requests on a Unix socket until interrupted.
+    Every connection has its own thread, so concurrent requests meet in the batcher.
+
+    Args:
+        batcher (MicroBatcher): Batcher of the loaded model
+        socket_path (string): Unix socket path
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                try:
+                    rows = parse_request(raw.decode())
+                    if rows is None:
+                        response = batcher.stats.snapshot()
+                    else:
+                        response = {"predictions": batcher.submit(rows).result()}
+                except Exception as error:
+                    response = {"error": f"{type(error).__name__}: {error}"}
+                self.wfile.write(f"{json.dumps(response, default=str)}\n".encode())
+                self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    # Remove a stale socket file left by a previous server.
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with Server(socket_path, Handler) as server:
+        print(f"Serving on {socket_path}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def request(connection, payload):
+    """
+    Send one request on an open connection and read its response.
+
+    Args:
+        connection (tuple): (socket, file) opened by connect()
+        payload (dict): Request
+
+    Returns:
+        dict: Response
+    """
+    sock, reader = connection
+    sock.sendall(f"{json.dumps(payload, default=str)}\n".encode())
+    return json.loads(reader.readline())
+
+
+def connect(socket_path):
+    """
+    Open a client connection to the server.
+
+    Args:
+        socket_path (string): Unix socket path
+
+    Returns:
+        tuple: (socket, file) to pass to request()
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    return sock, sock.makefile("r")
+
+
+def load_test(socket_path, rows, clients=16, requests_per_client=200, batch_rows=1):
+    """
+    Load generator: concurrent clients each send requests of a few rows
+    back to back and measure their round-trip latency.
+
+    Args:
+        socket_path (string): Unix socket path
+        rows (DataFrame): Raw rows the requests are drawn from
+        clients (int): Concurrent connections
+        requests_per_client (int): Requests sent by every connection
+        batch_rows (int): Rows per request
+
+    Returns:
+        dict: Client-side throughput and p50 / p99 latency, and the server counters
+    """
+    records = json.loads(rows.to_json(orient="records"))
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+
+    def client(index):
+        connection = connect(socket_path)
+        rng = np.random.default_rng(index)
+        try:
+            for _ in range(requests_per_client):
+                positions = rng.integers(0, len(records), batch_rows)
+                payload = {"rows": [records[position] for position in positions]}
+                start = time.perf_counter()
+                response = request(connection, payload)
+                latencies[index].append(time.perf_counter() - start)
+                errors[index] += "error" in response
+        finally:
+            connection[0].close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for client in latencies for latency in client]
+    connection = connect(socket_path)
+    try:
+        server_stats = request(connection, {"stats": True})
+    finally:
+        connection[0].close()
+
+    return {
+        "requests": len(all_latencies),
+        "errors": sum(errors),
+        "rows_per_second": len(all_latencies) * batch_rows / elapsed,
+        "client_p50_ms": percentile_ms(all_latencies, 50),
+        "client_p99_ms": percentile_ms(all_latencies, 99),
+        "server_p50_ms": server_stats["p50_ms"],
+        "server_p99_ms": server_stats["p99_ms"],
+        "mean_batch_rows": server_stats["mean_batch_rows"],
+    }
+
+
+def benchmark(predict, columns, rows, settings, **load_options):
+    """
+    Run the load generator against in-process servers with several batching settings.
+
+    Args:
+        predict (callable): Vectorized predict function of raw rows
+        columns (list): Raw columns predict reads
+        rows (DataFrame): Raw rows the requests are drawn from
+        settings (list): (max_batch_size, max_wait) pairs, (1, 0) disables batching
+        **load_options: load_test() arguments
+
+    Returns:
+        DataFrame: One row per setting
+    """
+    results = []
+    for max_batch_size, max_wait in settings:
+        with tempfile.TemporaryDirectory() as directory:
+            socket_path = os.path.join(directory, "serving.sock")
+            batcher = MicroBatcher(predict, columns, max_batch_size, max_wait)
+            thread = threading.Thread(
+                target=serve, args=(batcher, socket_path), daemon=True
+            )
+            thread.start()
+            while not os.path.exists(socket_path):
+                time.sleep(0.01)
+
+            result = load_test(socket_path, rows, **load_options)
+            results.append(
+                {"max_batch_size": max_batch_size, "max_wait_ms": max_wait * 1000}
+                | result
+            )
+    return pd.DataFrame(results).set_index(["max_batch_size", "max_wait_ms"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching prediction server.")
+    parser.add_argument("mode", choices=["serve", "bench"])
+    parser.add_argument("data_path", help="training CSV of the model")
+    parser.add_argument("--model", default=None, help="class name (auto-detected)")
+    parser.add_argument("--socket", default="./serving.sock")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT * 1000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="per client")
+    parser.add_argument("--rows", type=int, default=1, help="rows per request")
+    args = parser.parse_args()
+
+    # Fit (or load) the model and its preprocessing once.
+    model = getattr(student, args.model or find_model())(args.data_path)
+    predict = model.predictor()
+    columns = model.input_columns()
+
+    if args.mode == "serve":
+        batcher = MicroBatcher(
+            predict, columns, args.max_batch_size, args.max_wait_ms / 1000
+        )
+        serve(batcher, args.socket)
+        return
+
+    # The requests replay rows of the training CSV.
+    rows = pd.read_csv(args.data_path).head(10_000)
+    settings = [(1, 0.0), (args.max_batch_size, args.max_wait_ms / 1000)]
+    table = benchmark(
+        predict,
+        columns,
+        rows,
+        settings,
+        clients=args.clients,
+        requests_per_client=args.requests,
+        batch_rows=args.rows,
+    )
+    print(table.to_string(float_format=lambda value: f"{value:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,108 @@
+import functools
+import os
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.metrics import f1_score
+import artifacts
+import dataset
+import encoding
+import splits
+from search import CachedSearchCV, data_fingerprint
+from stages import stage
+
+ENGINES = ("random_forest", "hist_gradient_boosting")
 
 
 class MushroomClassifier:
-    def __init__(self, data_path):
+    def __init__(
+        self,
+        data_path,
+        search="grid",
+        search_resource="n_estimators",
+        sparse=False,
+        engine="random_forest",
+    ):
+        """
+        Class constructor method.
+
+        Args:
+            data_path (string): CSV dataset path
+            search (string): Q5 hyperparameter search, "grid" (exhaustive)
+                or "halving" (successive halving)
+            search_resource (string): Halving budget, "n_estimators" or "n_samples"
+            sparse (bool): Q4 encodes the features as a CSR sparse matrix
+                instead of a dense DataFrame (random_forest engine only)
+            engine (string): "random_forest" (one-hot features and a random forest
+                grid search) or "hist_gradient_boosting" (category codes and
+                gradient boosting with native categorical splits and early stopping)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+        if sparse and engine == "hist_gradient_boosting":
+            raise ValueError(
+                "sparse=True needs one-hot features, the hist_gradient_boosting"
+                " engine uses category codes"
+            )
+
         # Initialization attributes
         self.data_path = data_path
-        self.df = pd.read_csv(data_path)
+        self.search = search
+        self.search_resource = search_resource
+        self.sparse = sparse
+        self.engine = engine
+        self.df = dataset.load_csv(data_path, schema="mushroom")
 
         # Additional attributes
+        self.fill_values = None
+        self.encoder = None
         self.X_train = None
         self.y_train = None
         self.X_test = None
         self.y_test = None
 
         self.model = None
+        self.artifact_path = None
+        self.artifact = None
         self.y_pred = None
 
+    def predictor(self):
+        """
+        Scoring function of the Q5 model for raw rows (used by the prediction server).
+
+        Returns:
+            callable: Function from raw rows (DataFrame) to predicted labels
+        """
+        if self.engine != "random_forest":
+            raise ValueError("Only the random_forest engine saves a model artifact")
+        self.Q5()
+        return functools.partial(artifacts.predict_batch, self.artifact)
+
+    def input_columns(self):
+        """
+        Raw columns read by the predictor() function (checked by the prediction server).
+
+        Returns:
+            list: Column names
+        """
+        self.predictor()
+        encoder = self.artifact["encoder"]
+        return [*encoder.passthrough_, *encoder.columns]
+
+    def predict_batch(self, data, batch_size=artifacts.BATCH_SIZE):
+        """
+        Score new raw rows with the Q5 model, imputed and encoded like the training data.
+
+        Args:
+            data (string or DataFrame): CSV path or raw rows
+            batch_size (int): Rows per batch
+
+        Returns:
+            ndarray: Predicted label of every row
+        """
+        return self.predictor()(data, batch_size=batch_size)
+
+    @stage()
     def Q1(self):
         """
         Q1: Before doing the data preparation,
@@ -27,6 +111,7 @@ class MushroomClassifier:
         missing_values = self.df["gill-size"].isna().sum()
         return missing_values
 
+    @stage()
     def Q2(self):
         """
         Q2: How many rows of data and variables after doing these operations?
@@ -68,6 +153,7 @@ class MushroomClassifier:
         # Return shape of the new DataFrame
         return self.df.shape
 
+    @stage("Q2")
     def Q3(self):
         """
         Q3: Answer the quantity of "class_0" and "class1"  after doing operations
@@ -77,9 +163,6 @@ class MushroomClassifier:
             -   Convert the label variable `e` (edible) to `1` and `p` (poisonous) to `0`
                 and check the quantity of `class0` and `class1`.
         """
-        # Ensure that all processes in Q2 has already executed.
-        self.Q2()
-
         # Fill missing value on numerical columns with mean.
         NUMERIC_COLS = ["cap-color-rate"]
         mean_value = self.df[NUMERIC_COLS].mean()
@@ -101,6 +184,9 @@ class MushroomClassifier:
         mode_values = self.df[CATEGORICAL_COLS].mode().iloc[0]
         self.df[CATEGORICAL_COLS] = self.df[CATEGORICAL_COLS].fillna(mode_values)
 
+        # Keep the imputation values, new rows are filled the same way.
+        self.fill_values = {**mean_value.to_dict(), **mode_values.to_dict()}
+
         # Convert targets (label) into numerical values.
         MAPPINGS = {"e": 1, "p": 0}
         self.df["label"] = self.df["label"].map(MAPPINGS)
@@ -112,6 +198,7 @@ class MushroomClassifier:
         # Return counts as a tuple
         return (n_negative, n_positive)
 
+    @stage("Q3")
     def Q4(self):
         """
         Q4: What are training dataset's shape ("X_train")
@@ -123,9 +210,6 @@ class MushroomClassifier:
             -   Split train/test with 20% test, stratify,
                 and seed = 2020.
         """
-        # Ensure that all processes in Q2 to Q3 has already executed.
-        self.Q3()
-
         # Initialize a list of categorical columns
         CATEGORICAL_COLS = [
             "cap-shape",
@@ -140,23 +224,41 @@ class MushroomClassifier:
             "habitat",
         ]
 
-        # Apply one-hot encoding
-        self.df = pd.get_dummies(
-            self.df, columns=CATEGORICAL_COLS, drop_first=True, dtype=int
-        )
-
         # Features and target splitting
         X = self.df.drop(columns=["label"])
         y = self.df["label"]
 
+        # The gradient boosting engine splits on categories natively,
+        # so it keeps one integer category code per nominal column.
+        if self.engine == "hist_gradient_boosting":
+            X = X.assign(**{col: X[col].cat.codes for col in CATEGORICAL_COLS})
+
+        # Apply one-hot encoding
+        # (The columns of pd.get_dummies(..., drop_first=True, dtype=int) for the observed categories,
+        # with a layout fitted once so new rows are encoded the same way.)
+        elif self.sparse:
+            self.encoder = encoding.OneHotEncoder(CATEGORICAL_COLS, drop_first=True)
+            X = self.encoder.fit_transform(X)
+        else:
+            self.encoder = encoding.OneHotEncoder(
+                CATEGORICAL_COLS, drop_first=True, sparse=False, dtype=int
+            )
+            X = self.encoder.fit_transform(X)
+
         # Train dataset and test dataset splitting using stratification.
-        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            X, y, test_size=0.2, random_state=2020, stratify=y
+        # (Row positions are split on the labels alone, then each frame is taken once;
+        # the same rows as train_test_split(..., random_state=2020, stratify=y).)
+        train_rows, test_rows = splits.stratified_split(
+            y, test_size=0.2, random_state=2020
         )
+        self.X_train = splits.take(X, train_rows)
+        self.X_test = splits.take(X, test_rows)
+        self.y_train, self.y_test = y.take(train_rows), y.take(test_rows)
 
         # Return a shape of train dataset and test dataset.
         return (self.X_train.shape, self.X_test.shape)
 
+    @stage("Q4")
     def Q5(self):
         """
         Q5: Find the best parameter for Random Forest model using Grid Search
@@ -168,8 +270,10 @@ class MushroomClassifier:
             - "n_estimators": [100]
             - "random_state": [2020]
         """
-        # Ensure that all processes in Q2 to Q4 has already executed.
-        self.Q4()
+        # The gradient boosting engine stops early on a validation split
+        # of the training data instead of searching a grid.
+        if self.engine == "hist_gradient_boosting":
+            return self._fit_hist_gradient_boosting()
 
         # Initialize parameters for GridSearchCV
         PARAM_GRID = {
@@ -180,30 +284,89 @@ class MushroomClassifier:
             "random_state": [2020],
         }
 
-        # Initialize GridSearchCV object
-        self.model = GridSearchCV(
+        # Fold scores are cached next to the dataset, so a re-run only fits new cells.
+        cache_dir = os.path.join(
+            os.path.dirname(os.path.abspath(self.data_path)), dataset.CACHE_DIR
+        )
+
+        # Initialize the grid search object
+        # (The best model is refitted below, or loaded if it was saved before.)
+        self.model = CachedSearchCV(
             estimator=RandomForestClassifier(),
             param_grid=PARAM_GRID,
             cv=5,
             n_jobs=-1,
             scoring="f1_weighted",
+            search=self.search,
+            resource=self.search_resource,
+            cache_dir=cache_dir,
+            refit=False,
         )
 
         # Begin grid search algorithm to search for the best model
         self.model.fit(self.X_train, self.y_train)
 
+        # Load the best model saved for this training data and these parameters,
+        # or refit it on the whole training data and save it with its preprocessing.
+        fingerprint = data_fingerprint(self.X_train, self.y_train)
+        self.artifact_path = artifacts.artifact_path(
+            cache_dir, fingerprint, self.model.best_params_
+        )
+        # (An artifact that cannot be read or written is a cache miss.)
+        self.artifact = artifacts.load_cached(self.artifact_path)
+        if self.artifact is None:
+            best_model = clone(self.model.estimator).set_params(
+                **self.model.best_params_
+            )
+            best_model.fit(self.X_train, self.y_train)
+            self.artifact = artifacts.build(
+                best_model,
+                self.encoder,
+                self.fill_values,
+                self.model.best_params_,
+                fingerprint,
+            )
+            artifacts.save(self.artifact_path, self.artifact)
+        self.model.best_estimator_ = self.artifact["model"]
+
         # Returns tuple of all parameters values
         best_params = tuple(self.model.best_params_.values())
         return best_params
 
+    def _fit_hist_gradient_boosting(self):
+        """
+        Q5 of the gradient boosting engine: fit on the category codes,
+        with the nominal columns declared categorical.
+
+        Returns:
+            tuple: learning rate, maximum leaf nodes and boosting iterations kept
+        """
+        HGB_PARAMS = {
+            "learning_rate": 0.1,
+            "max_leaf_nodes": 31,
+            "max_iter": 200,
+            "early_stopping": True,
+            "validation_fraction": 0.1,
+            "n_iter_no_change": 10,
+            "random_state": 2020,
+        }
+
+        self.model = HistGradientBoostingClassifier(
+            categorical_features=dataset.NOMINAL_COLUMNS, **HGB_PARAMS
+        )
+        self.model.fit(self.X_train, self.y_train)
+        return (
+            self.model.learning_rate,
+            self.model.max_leaf_nodes,
+            self.model.n_iter_,
+        )
+
+    @stage("Q5")
     def Q6(self):
         """
         Q6: After doing all process in Q2 to Q5, what is the value of
             macro F1 score rounded to 2 decimal places?
         """
-        # Ensure that all processes in Q2 to Q5 has already executed.
-        self.Q5()
-
         # Predict the test value using the model
         self.y_pred = self.model.predict(self.X_test)
 
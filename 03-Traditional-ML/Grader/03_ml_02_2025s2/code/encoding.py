@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+"""
+    ONE-HOT ENCODING:
+    A one-hot encoder whose categories are fitted once, so every frame it transforms
+    (train, test or new rows) gets the same column layout. pd.get_dummies instead
+    derives the columns from the frame it is given, so two frames encoded separately
+    can disagree on their columns.
+    The layout follows pd.get_dummies: the other columns first, then one column
+    per observed category ("<column>_<category>") in category order. Unlike
+    pd.get_dummies, unused categories of a categorical column get no column, so the
+    layout only depends on the values of the fitted frame (unless the categories of a
+    column are given explicitly, e.g. a fixed vocabulary). The output is either a
+    CSR sparse matrix, which stores only the non-zero cells and is accepted as is by
+    RandomForestClassifier and LogisticRegression, or a dense DataFrame.
+    Unknown and missing categories encode as all-zero rows.
+"""
+
+
+def category_values(values):
+    """
+    Categories of a column, in the order pd.get_dummies uses.
+
+    Args:
+        values (Series): Column to encode
+
+    Returns:
+        Index: Used categories of a categorical column (in category order),
+            or the sorted distinct values of any other column
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories().cat.categories
+    return pd.Index(values.dropna().unique()).sort_values()
+
+
+class OneHotEncoder:
+    def __init__(
+        self, columns, drop_first=False, sparse=True, dtype=np.float64, categories=None
+    ):
+        """
+        Class constructor method.
+
+        Args:
+            columns (list): Nominal columns to encode, the other columns pass through
+            drop_first (bool): Drop the first category of every column
+            sparse (bool): Return a CSR matrix (True) or a DataFrame (False)
+            dtype (type): Value type of the one-hot columns
+                (and of every column of a sparse output)
+            categories (dict): Fixed categories of some columns (e.g. a known
+                vocabulary), used as given instead of the values seen by fit()
+        """
+        # Initialization attributes
+        self.columns = list(columns)
+        self.drop_first = drop_first
+        self.sparse = sparse
+        self.dtype = dtype
+        self.categories = categories or {}
+
+        # Additional attributes
+        self.categories_ = None
+        self.passthrough_ = None
+        self.feature_names_ = None
+
+    def fit(self, df):
+        """
+        Record the categories of every encoded column and the passthrough columns.
+
+        Args:
+            df (DataFrame): Data to learn the layout from
+
+        Returns:
+            OneHotEncoder: The fitted encoder
+        """
+        self.categories_ = {
+            col: (
+                pd.Index(self.categories[col])
+                if col in self.categories
+                else category_values(df[col])
+            )
+            for col in self.columns
+        }
+        self.passthrough_ = [col for col in df.columns if col not in self.columns]
+
+        self.feature_names_ = list(self.passthrough_)
+        for col, categories in self.categories_.items():
+            kept = categories[1:] if self.drop_first else categories
+            self.feature_names_.extend(f"{col}_{value}" for value in kept)
+        return self
+
+    def codes(self, values, col):
+        """
+        Output column offset of every value of an encoded column.
+
+        Args:
+            values (Series): Column values
+            col (string): Column name
+
+        Returns:
+            ndarray: Offset within the one-hot block of the column, -1 for no column
+                (unknown, missing or dropped first category)
+        """
+        categories = self.categories_[col]
+        codes = pd.Categorical(values, categories=categories).codes.astype(np.int64)
+        if self.drop_first:
+            codes = np.where(codes > 0, codes - 1, -1)
+        return codes
+
+    def transform(self, df):
+        """
+        Encode a frame with the fitted layout.
+
+        Args:
+            df (DataFrame): Data with the fitted columns
+
+        Returns:
+            csr_matrix or DataFrame: Encoded rows, columns in feature_names_ order
+        """
+        if self.categories_ is None:
+            raise ValueError("The encoder is not fitted yet")
+        if self.sparse:
+            return self._transform_sparse(df)
+        return self._transform_dense(df)
+
+    def fit_transform(self, df):
+        """
+        Fit the encoder on a frame, then encode it.
+
+        Args:
+            df (DataFrame): Data to learn the layout from and to encode
+
+        Returns:
+            csr_matrix or DataFrame: Encoded rows
+        """
+        return self.fit(df).transform(df)
+
+    def _transform_sparse(self, df):
+        """
+        Build the CSR matrix from (row, column, value) triplets of the non-zero cells.
+
+        Args:
+            df (DataFrame): Data with the fitted columns
+
+        Returns:
+            csr_matrix: Encoded rows
+        """
+        n_rows = len(df)
+        rows, cols, data = [], [], []
+
+        # Passthrough columns keep their non-zero values (NaN is kept as well).
+        for index, col in enumerate(self.passthrough_):
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            (nonzero,) = np.nonzero(values != 0)
+            rows.append(nonzero)
+            cols.append(np.full(len(nonzero), index))
+            data.append(values[nonzero])
+
+        # Every encoded column sets at most one cell per row.
+        offset = len(self.passthrough_)
+        for col, categories in self.categories_.items():
+            codes = self.codes(df[col], col)
+            (known,) = np.nonzero(codes >= 0)
+            rows.append(known)
+            cols.append(offset + codes[known])
+            data.append(np.ones(len(known)))
+            offset += len(categories) - int(self.drop_first)
+
+        matrix = scipy.sparse.csr_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, len(self.feature_names_)),
+            dtype=self.dtype,
+        )
+        matrix.sort_indices()
+        return matrix
+
+    def _transform_dense(self, df):
+        """
+        Build the dense frame, like pd.get_dummies with the fitted categories.
+
+        Args:
+            df (DataFrame): Data with the fitted columns
+
+        Returns:
+            DataFrame: Encoded rows, with the index of df
+        """
+        blocks = [df[self.passthrough_]]
+        for col, categories in self.categories_.items():
+            kept = categories[1:] if self.drop_first else categories
+            codes = self.codes(df[col], col)
+            one_hot = codes[:, None] == np.arange(len(kept))
+            blocks.append(
+                pd.DataFrame(
+                    one_hot.astype(self.dtype),
+                    index=df.index,
+                    columns=[f"{col}_{value}" for value in kept],
+                )
+            )
+        return pd.concat(blocks, axis=1)
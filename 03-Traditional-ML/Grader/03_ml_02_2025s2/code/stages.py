@@ -0,0 +1,107 @@
+import functools
+import pandas as pd
+
+"""
+    QUESTION STAGES:
+    Each question method of a class is a stage that declares the stage it builds on.
+    A stage runs at most once per instance. Its answer and the instance attributes it
+    leaves behind are kept as a snapshot, and every downstream stage starts from the
+    snapshot of its upstream stage instead of re-running the whole chain.
+"""
+
+# Copy-on-write makes a shallow DataFrame copy a safe snapshot.
+# (Copy-on-write is always enabled from pandas 3.0.)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+STATE_PREFIX = "_stage_"
+
+
+def fresh(value):
+    """
+    Copy pandas objects shallowly, so a stage that modifies its input
+    cannot modify a stored snapshot. Other values are shared.
+
+    Args:
+        value (object): Attribute value
+
+    Returns:
+        object: Value safe to hand to the next stage
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+def snapshot(instance):
+    """
+    Capture the instance attributes that the stages read and write.
+
+    Args:
+        instance (object): Object with stage methods
+
+    Returns:
+        dict: Attribute name mapped to its value
+    """
+    return {
+        name: fresh(value)
+        for name, value in vars(instance).items()
+        if not name.startswith(STATE_PREFIX)
+    }
+
+
+def restore(instance, state):
+    """
+    Put the instance attributes back to a snapshot.
+
+    Args:
+        instance (object): Object with stage methods
+        state (dict): Snapshot created by snapshot()
+    """
+    for name, value in state.items():
+        setattr(instance, name, fresh(value))
+
+
+def stage(upstream=None):
+    """
+    Declare a question method as a stage of the instance pipeline.
+
+    Args:
+        upstream (string): Name of the stage whose output this stage starts from,
+            or None to start from the state right after __init__
+
+    Returns:
+        callable: Method decorator
+    """
+
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self):
+            results = self.__dict__.setdefault(f"{STATE_PREFIX}results", {})
+            states = self.__dict__.setdefault(f"{STATE_PREFIX}states", {})
+
+            # The first stage call records the state created by __init__.
+            if None not in states:
+                states[None] = snapshot(self)
+
+            # An answered stage only restores its snapshot.
+            if name in results:
+                restore(self, states[name])
+                return results[name]
+
+            # Start from the upstream output (computed once, then reused).
+            if upstream is None:
+                restore(self, states[None])
+            else:
+                getattr(self, upstream)()
+
+            results[name] = method(self)
+            states[name] = snapshot(self)
+            return results[name]
+
+        wrapper.upstream = upstream
+        return wrapper
+
+    return decorator
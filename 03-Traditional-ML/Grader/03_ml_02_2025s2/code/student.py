@@ -1,25 +1,46 @@
 import warnings
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import f1_score
 from sklearn.exceptions import ConvergenceWarning
+import dataset
+import encoding
+import profiler
+import splits
+from stages import stage
+
+# Ranks of the ordinal education column (Q6).
+EDUCATION_ORDER = {
+    "illiterate": 1,
+    "basic.4y": 2,
+    "basic.6y": 3,
+    "basic.9y": 4,
+    "high.school": 5,
+    "professional.course": 6,
+    "university.degree": 7,
+}
 
 
 class BankLogistic:
-    def __init__(self, data_path):
+    def __init__(self, data_path, sparse=False):
         """
         Class constructor method.
 
         Args:
             data_path (string): CSV dataset path
+            sparse (bool): Q6 encodes the features as a CSR sparse matrix
+                instead of a dense DataFrame
         """
         # Initialization attributes
         self.data_path = data_path
-        self.df = pd.read_csv(data_path)
+        self.sparse = sparse
+        self.df = dataset.load_csv(data_path, schema="bank")
 
         # Additional attributes
+        self.fill_values = None
+        self.ordinal_mappings = None
+        self.encoder = None
         self.X_train = None
         self.y_train = None
         self.X_test = None
@@ -28,12 +49,50 @@ class BankLogistic:
         self.model = None
         self.y_pred = None
 
+    def predict_rows(self, df):
+        """
+        Predict raw rows with the preprocessing fitted in Q5 and Q6 and the Q7 model.
+
+        Args:
+            df (DataFrame): Raw rows with (at least) the feature columns of X_train
+
+        Returns:
+            ndarray: Predicted "no" / "yes" labels
+        """
+        X = df[[*self.encoder.passthrough_, *self.encoder.columns]]
+        X = X.replace("unknown", np.nan).fillna(self.fill_values)
+        for col, mapping in self.ordinal_mappings.items():
+            X[col] = X[col].map(mapping).astype("float64")
+        return self.model.predict(self.encoder.transform(X))
+
+    def predictor(self):
+        """
+        Scoring function of the Q7 model for raw rows (used by the prediction server).
+
+        Returns:
+            callable: Function from raw rows (DataFrame) to predicted labels
+        """
+        self.Q7()
+        return self.predict_rows
+
+    def input_columns(self):
+        """
+        Raw columns read by the predictor() function (checked by the prediction server).
+
+        Returns:
+            list: Column names
+        """
+        self.Q7()
+        return [*self.encoder.passthrough_, *self.encoder.columns]
+
+    @stage()
     def Q1(self):
         """
         Q1: How many rows of data are there in total?
         """
         return self.df.shape[0]
 
+    @stage()
     def Q2(self):
         """
         Q2: Return the tuple of numeric variables and categorical variables
@@ -50,6 +109,7 @@ class BankLogistic:
         # Return amount of numeric columns and categorical columns.
         return (n_col_numeric, n_col_categorical)
 
+    @stage()
     def Q3(self):
         """
         Q3: Return the tuple of ratio the Class 0 (no)
@@ -65,6 +125,7 @@ class BankLogistic:
         # Return as a tuple
         return (negative_ratio, positive_ratio)
 
+    @stage()
     def Q4(self):
         """
         Q4: Remove duplicate records from the data.
@@ -73,6 +134,7 @@ class BankLogistic:
         self.df = self.df.drop_duplicates()
         return self.df.shape
 
+    @stage("Q4")
     def Q5(self):
         """
         Q5: Do the following operations
@@ -82,21 +144,22 @@ class BankLogistic:
                 by stratification and use seed 0
             After these operations, return the tuple of X_train shape and X_test shape.
         """
-        # Ensure that all processes in Q4 has already executed.
-        self.Q4()
-
         # Replace all "unknown" in the entire DataFrame to null value.
         self.df = self.df.replace("unknown", np.nan)
 
-        # Initialize list to store column name with 99% flat values.
-        REMOVE_THRESHOLD = 0.99
-        drop_cols = []
+        # Categorical columns keep "unknown" as an empty category, so drop it as well.
+        CATEGORY_COLS = self.df.select_dtypes(include=["category"]).columns
+        self.df[CATEGORY_COLS] = self.df[CATEGORY_COLS].apply(
+            lambda col: col.cat.remove_unused_categories()
+        )
 
-        # Iterate each column and find the one with 99% flat value.
-        for col_name in self.df.columns:
-            max_percentage = self.df[col_name].value_counts(normalize=True).max()
-            if max_percentage >= REMOVE_THRESHOLD:
-                drop_cols.append(col_name)
+        # Find the columns with 99% flat value from a one-pass profile of every column.
+        # (top_ratio is value_counts(normalize=True).max(), missing values excluded.)
+        REMOVE_THRESHOLD = 0.99
+        column_profile = profiler.profile(self.df, quantiles=())
+        drop_cols = column_profile.index[
+            column_profile["top_ratio"] >= REMOVE_THRESHOLD
+        ].tolist()
 
         # Drop the column with 99% flat value
         self.df = self.df.drop(columns=drop_cols)
@@ -106,13 +169,18 @@ class BankLogistic:
         y = self.df["y"]
 
         # Split train dataset and test dataset by stratification.
-        self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
-            X, y, test_size=0.3, stratify=y, random_state=0
+        # (Row positions are split on the labels alone, then each frame is taken once;
+        # the same rows as train_test_split(..., stratify=y, random_state=0).)
+        train_rows, test_rows = splits.stratified_split(
+            y, test_size=0.3, random_state=0
         )
+        self.X_train, self.X_test = X.take(train_rows), X.take(test_rows)
+        self.y_train, self.y_test = y.take(train_rows), y.take(test_rows)
 
         # Return shape of X_train and X_test
         return (self.X_train.shape, self.X_test.shape)
 
+    @stage("Q5")
     def Q6(self):
         """
         Q6: Do the following operations
@@ -128,9 +196,6 @@ class BankLogistic:
                 -   Map "university.degree" to 7
             After these operations, return the shape of X_train.
         """
-        # Ensure that all processes in Q4 to Q5 has already executed.
-        self.Q5()
-
         # Selecting numeric columns and categorical columns
         NUMERIC_COLS = self.X_test.select_dtypes(include=["number"]).columns
         CATEGORICAL_COLS = self.X_test.select_dtypes(exclude=["number"]).columns
@@ -139,6 +204,9 @@ class BankLogistic:
         mean_values = self.X_train[NUMERIC_COLS].mean()
         self.X_train[NUMERIC_COLS] = self.X_train[NUMERIC_COLS].fillna(mean_values)
 
+        # Keep the train imputation values, new rows are filled the same way.
+        self.fill_values = mean_values.to_dict()
+
         mean_values = self.X_test[NUMERIC_COLS].mean()
         self.X_test[NUMERIC_COLS] = self.X_test[NUMERIC_COLS].fillna(mean_values)
 
@@ -147,6 +215,7 @@ class BankLogistic:
         self.X_train[CATEGORICAL_COLS] = self.X_train[CATEGORICAL_COLS].fillna(
             mode_values
         )
+        self.fill_values.update(mode_values.to_dict())
 
         mode_values = self.X_test[CATEGORICAL_COLS].mode().iloc[0]
         self.X_test[CATEGORICAL_COLS] = self.X_test[CATEGORICAL_COLS].fillna(
@@ -155,28 +224,33 @@ class BankLogistic:
 
         # Create mappings for ordinal category columns (education).
         ORDINAL_COLS = "education"
-        EDUCATION_ORDER = {
-            "illiterate": 1,
-            "basic.4y": 2,
-            "basic.6y": 3,
-            "basic.9y": 4,
-            "high.school": 5,
-            "professional.course": 6,
-            "university.degree": 7,
-        }
+        self.ordinal_mappings = {ORDINAL_COLS: EDUCATION_ORDER}
 
         # Apply mappings to the education column.
-        self.X_train[ORDINAL_COLS] = self.X_train[ORDINAL_COLS].map(EDUCATION_ORDER)
-        self.X_test[ORDINAL_COLS] = self.X_test[ORDINAL_COLS].map(EDUCATION_ORDER)
+        # (Mapping a categorical column keeps it categorical, so convert the ranks to numbers.)
+        self.X_train[ORDINAL_COLS] = (
+            self.X_train[ORDINAL_COLS].map(EDUCATION_ORDER).astype("float64")
+        )
+        self.X_test[ORDINAL_COLS] = (
+            self.X_test[ORDINAL_COLS].map(EDUCATION_ORDER).astype("float64")
+        )
 
         # Apply one hot encoding for nominal categorical columns.
+        # (The categories are fitted on the train dataset only, so the test dataset
+        # always gets the same columns, unlike two separate pd.get_dummies calls.)
         NOMINAL_COLS = self.X_train.select_dtypes(exclude=["number"]).columns
-        self.X_train = pd.get_dummies(self.X_train, columns=NOMINAL_COLS, dtype=int)
-        self.X_test = pd.get_dummies(self.X_test, columns=NOMINAL_COLS, dtype=int)
+        if self.sparse:
+            self.encoder = encoding.OneHotEncoder(NOMINAL_COLS)
+        else:
+            self.encoder = encoding.OneHotEncoder(NOMINAL_COLS, sparse=False, dtype=int)
+        self.encoder.fit(self.X_train)
+        self.X_train = self.encoder.transform(self.X_train)
+        self.X_test = self.encoder.transform(self.X_test)
 
         # Return shape of X_train
         return self.X_train.shape
 
+    @stage("Q6")
     def Q7(self):
         """
         Q7: Train a Logistic Regression model with the following parameters
@@ -186,9 +260,6 @@ class BankLogistic:
             What is the macro F1 score of the model on the test data rounded
             in 2 decimal places.
         """
-        # Ensure that all processes in Q4 to Q6 has already executed.
-        self.Q6()
-
         # Ignore the convergence warning.
         warnings.filterwarnings("ignore", category=ConvergenceWarning)
 
@@ -199,6 +270,7 @@ class BankLogistic:
 
         # Train a model
         model.fit(self.X_train, self.y_train)
+        self.model = model
 
         # Model prediction
         self.y_pred = model.predict(self.X_test)
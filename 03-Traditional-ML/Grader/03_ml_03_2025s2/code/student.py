@@ -2,13 +2,15 @@ import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
+import dataset
+from stages import stage
 
 
 class Clustering:
     def __init__(self, file_path):
         # Initialization Attributes
         self.file_path = file_path
-        self.df = pd.read_csv(file_path)
+        self.df = dataset.load_csv(file_path, schema="edible_mushroom")
 
         # Additional Attributes
         self.scaler = None
@@ -16,6 +18,7 @@ class Clustering:
         self.centroids = None
         self.normalized_centroids = None
 
+    @stage()
     def Q1(self):
         """
         Q1: Please do the following operations
@@ -52,6 +55,7 @@ class Clustering:
         # Return the shape of the normalized DataFrame
         return self.df.shape
 
+    @stage("Q1")
     def Q2(self):
         """
         Q2: Please do the following operations
@@ -64,9 +68,6 @@ class Clustering:
             -   cap-color-rate
             -   stalk-color-above-ring-rate
         """
-        # Ensure that all operations in Q1 are executed.
-        self.Q1()
-
         # Initialize K-means clustering model.
         self.model = KMeans(n_clusters=5, random_state=0, n_init="auto")
 
@@ -83,6 +84,7 @@ class Clustering:
         # Return maximum centroids.
         return max_centroids
 
+    @stage("Q2")
     def Q3(self):
         """
         Q3: Please do the following operations
@@ -90,9 +92,6 @@ class Clustering:
         -   Convert the centrioid value to the original scale.
         Show the minimum centroid of 2 features rounded in 2 decimal places.
         """
-        # Ensure that all operations in Q1 to Q2 are executed.
-        self.Q2()
-
         # Scale back to the original scale.
         self.centroids = self.scaler.inverse_transform(self.normalized_centroids)
 
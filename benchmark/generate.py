@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+"""
+    SCALED DATASET GENERATOR:
+    Build 10x, 100x, 1000x, ... copies of every course dataset for the benchmark harness.
+    Each copy is made of replicas of the original rows, so column distributions and
+    missing-value rates are preserved. Every replica gets its own identifiers and a small
+    deterministic jitter on a few numeric columns, so replicas do not collapse back into
+    the original rows when a question removes duplicates (exact duplicates of the
+    original data stay duplicates inside their replica).
+    The YouTube videos.csv is not shipped with the repository, so a base table with the
+    same schema is synthesized from category_id.json.
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Base dataset of each generated file.
+#   source: CSV path (or "zip:member" inside an attachment), None when synthesized
+#   read: pd.read_csv options
+#   ids: identifier columns made unique per replica
+#   jitter: numeric columns perturbed per replica by at most the given relative amount
+DATASETS = {
+    "scores.csv": {
+        "source": "01-Intro-to-Pandas/Grader/01_pandas_01_2025s2/code/scores.csv",
+        "read": {},
+        "ids": ["id"],
+        "jitter": {},
+    },
+    "videos.csv": {
+        "source": None,
+        "read": {},
+        "ids": ["video_id"],
+        "jitter": {"views": 0.05, "likes": 0.05, "dislikes": 0.05},
+    },
+    "titanic_to_student.csv": {
+        "source": "02-Data-Preparation/Grader/02_dataprep_01_2025s2/code/titanic_to_student.csv",
+        "read": {"index_col": 0},
+        "ids": ["PassengerId"],
+        "jitter": {"Fare": 0.02},
+    },
+    "mushroom2020_dataset.csv": {
+        "source": "03-Traditional-ML/Grader/03_ml_01_2025s2/code/mushroom2020_dataset.csv",
+        "read": {},
+        "ids": ["id"],
+        "jitter": {},
+    },
+    "ModifiedEdibleMushroom.csv": {
+        "source": "03-Traditional-ML/Grader/03_ml_03_2025s2/code/ModifiedEdibleMushroom.csv",
+        "read": {},
+        "ids": ["id"],
+        "jitter": {},
+    },
+    "bank-st.csv": {
+        "source": "zip:03-Traditional-ML/Grader/03_ml_02_2025s2/attachment/attachment.zip:bank-st.csv",
+        "read": {},
+        "ids": [],
+        "jitter": {"duration": 0.05},
+    },
+}
+
+CATEGORY_PATH = "01-Intro-to-Pandas/Grader/01_pandas_02_2025s2/code/category_id.json"
+VIDEOS_BASE_ROWS = 40000
+VIDEOS_DUPLICATE_RATE = 0.05
+
+
+def read_base(name):
+    """
+    Load the unscaled base table of a generated dataset.
+
+    Args:
+        name (string): Generated file name
+
+    Returns:
+        DataFrame: Base table
+    """
+    spec = DATASETS[name]
+    source = spec["source"]
+    if source is None:
+        return synthesize_videos(VIDEOS_BASE_ROWS)
+
+    if source.startswith("zip:"):
+        _, archive, member = source.split(":")
+        with zipfile.ZipFile(os.path.join(ROOT, archive)) as zip_file:
+            with zip_file.open(member) as file:
+                return pd.read_csv(file, **spec["read"])
+
+    return pd.read_csv(os.path.join(ROOT, source), **spec["read"])
+
+
+def synthesize_videos(n_rows, seed=0):
+    """
+    Synthesize a YouTube trending table with the videos.csv schema.
+
+    Args:
+        n_rows (int): Number of rows before duplication
+        seed (int): Random seed
+
+    Returns:
+        DataFrame: Trending rows, with VIDEOS_DUPLICATE_RATE exact duplicate rows
+    """
+    rng = np.random.default_rng(seed)
+    with open(os.path.join(ROOT, CATEGORY_PATH)) as file:
+        category_ids = [int(item["id"]) for item in json.load(file)["items"]]
+
+    # Videos trend for several days, so titles and ids repeat across dates.
+    n_videos = max(1, n_rows // 6)
+    video = rng.integers(0, n_videos, n_rows)
+    dates = pd.date_range("2017-11-14", "2018-06-14")
+    views = rng.lognormal(11, 2, n_rows).astype("int64")
+
+    df = pd.DataFrame(
+        {
+            "video_id": [f"vid{index:08d}" for index in video],
+            "trending_date": dates[rng.integers(0, len(dates), n_rows)].strftime(
+                "%y.%d.%m"
+            ),
+            "title": [f"Video title {index}" for index in video],
+            "channel_title": [f"Channel {index % 2000}" for index in video],
+            "category_id": np.array(category_ids)[video % len(category_ids)],
+            "publish_time": "2017-11-10T07:38:29.000Z",
+            "tags": "tag1|tag2|tag3",
+            "views": views,
+            "likes": (views * rng.uniform(0, 0.05, n_rows)).astype("int64"),
+            "dislikes": (views * rng.uniform(0, 0.01, n_rows)).astype("int64"),
+            "comment_count": (views * rng.uniform(0, 0.01, n_rows)).astype("int64"),
+            "thumbnail_link": "https://i.ytimg.com/vi/default.jpg",
+            "comments_disabled": rng.random(n_rows) < 0.01,
+            "ratings_disabled": rng.random(n_rows) < 0.01,
+            "video_error_or_removed": False,
+            "description": np.where(rng.random(n_rows) < 0.05, None, "Description"),
+        }
+    )
+
+    duplicates = df.sample(frac=VIDEOS_DUPLICATE_RATE, random_state=seed)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+
+def make_replica(base, replica, spec):
+    """
+    Build one replica of the base table.
+
+    Args:
+        base (DataFrame): Base table
+        replica (int): Replica number, replica 0 is the base table itself
+        spec (dict): Dataset entry of DATASETS
+
+    Returns:
+        DataFrame: Replica rows
+    """
+    if replica == 0:
+        return base
+
+    df = base.copy()
+    for col in spec["ids"]:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col] + replica * (int(base[col].max()) + 1)
+        else:
+            df[col] = df[col].astype(str) + f"-r{replica}"
+
+    # The jitter only depends on the row content and the replica number,
+    # so exact duplicate rows stay duplicates.
+    row_hash = pd.util.hash_pandas_object(base, index=False).to_numpy()
+    replica_key = np.uint64((replica * 0x9E3779B97F4A7C15) % 2**64)
+    noise = ((row_hash ^ replica_key) % 10007) / 10006
+    for col, amount in spec["jitter"].items():
+        values = df[col] * (1 + amount * (2 * noise - 1))
+        if pd.api.types.is_integer_dtype(base[col]):
+            values = values.round().astype(base[col].dtype)
+        df[col] = values
+
+    return df
+
+
+def generate(name, scale, output_dir):
+    """
+    Write a scaled copy of a dataset, one replica at a time.
+
+    Args:
+        name (string): Generated file name
+        scale (int): Number of replicas
+        output_dir (string): Directory of the scaled dataset
+
+    Returns:
+        string: Written file path
+    """
+    spec = DATASETS[name]
+    base = read_base(name)
+    write_index = "index_col" in spec["read"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, name)
+    for replica in range(scale):
+        df = make_replica(base, replica, spec)
+        if write_index:
+            df.index = df.index + replica * len(base)
+        df.to_csv(
+            path,
+            mode="w" if replica == 0 else "a",
+            header=replica == 0,
+            index=write_index,
+        )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate scaled benchmark datasets.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument(
+        "--datasets", nargs="+", default=list(DATASETS), choices=list(DATASETS)
+    )
+    parser.add_argument("--output", default=DATA_DIR, help="output directory")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        output_dir = os.path.join(args.output, f"x{scale}")
+        for name in args.datasets:
+            path = generate(name, scale, output_dir)
+            print(f"{path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+        # The category dimension of the YouTube data does not grow with the data.
+        with open(os.path.join(ROOT, CATEGORY_PATH)) as source:
+            with open(os.path.join(output_dir, "category_id.json"), "w") as target:
+                target.write(source.read())
+
+
+if __name__ == "__main__":
+    main()
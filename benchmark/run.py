@@ -0,0 +1,424 @@
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+"""
+    BENCHMARK HARNESS:
+    Time every question of every assignment on the scaled datasets of generate.py,
+    record the peak traced memory of each answer, and compare two result files.
+    Time and memory are measured in two separate passes (each in a fresh process),
+    because tracing allocations slows some questions down several times.
+    Every measured step starts with cold on-disk caches (dataset sidecars, search
+    scores, saved models): the data is linked into a fresh directory for each class
+    based question. The question is then run again in the same directory, and that
+    warm run is reported separately (warm_seconds, warm_peak_bytes).
+
+    python benchmark/run.py --scales 10 100 --output results.json
+    python benchmark/run.py compare baseline.json results.json
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Assignment code directory, the data files it reads, and how its questions are called:
+# through the grader driver (main.load / main.answer) or as methods of a fresh instance.
+# question_files passes a data file of the benchmark to a question argument
+# (instead of the default path of the grading environment).
+ASSIGNMENTS = {
+    "01_pandas_01": {
+        "code": "01-Intro-to-Pandas/Grader/01_pandas_01_2025s2/code",
+        "files": ["scores.csv"],
+        "driver": "main",
+    },
+    "01_pandas_02": {
+        "code": "01-Intro-to-Pandas/Grader/01_pandas_02_2025s2/code",
+        "files": ["videos.csv", "category_id.json"],
+        "driver": "main",
+        "question_files": {"Q5": {"category_path": "category_id.json"}},
+    },
+    "02_dataprep_01": {
+        "code": "02-Data-Preparation/Grader/02_dataprep_01_2025s2/code",
+        "files": ["titanic_to_student.csv"],
+        "driver": "main",
+    },
+    "03_ml_01": {
+        "code": "03-Traditional-ML/Grader/03_ml_01_2025s2/code",
+        "files": ["mushroom2020_dataset.csv"],
+        "class": "MushroomClassifier",
+    },
+    "03_ml_02": {
+        "code": "03-Traditional-ML/Grader/03_ml_02_2025s2/code",
+        "files": ["bank-st.csv"],
+        "class": "BankLogistic",
+    },
+    "03_ml_03": {
+        "code": "03-Traditional-ML/Grader/03_ml_03_2025s2/code",
+        "files": ["ModifiedEdibleMushroom.csv"],
+        "class": "Clustering",
+    },
+}
+
+
+def measure(function, trace_memory):
+    """
+    Run a function once and measure its wall time or its peak traced allocation.
+
+    Args:
+        function (callable): Function without arguments
+        trace_memory (bool): Measure the peak allocation instead of the wall time
+
+    Returns:
+        dict: seconds or peak_bytes, and error (None when the function succeeded)
+    """
+    error = None
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    try:
+        function()
+    except Exception as exception:
+        error = f"{type(exception).__name__}: {exception}"
+    seconds = time.perf_counter() - start
+
+    if not trace_memory:
+        return {"seconds": seconds, "error": error}
+
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"peak_bytes": peak_bytes, "error": error}
+
+
+@contextlib.contextmanager
+def private_data(name, data_dir):
+    """
+    Link the data files of an assignment into a fresh directory and work in it.
+    Every cache the code keeps next to its data starts cold in that directory.
+
+    Args:
+        name (string): Assignment name in ASSIGNMENTS
+        data_dir (string): Directory of one scale of the generated datasets
+
+    Returns:
+        generator: Yields the private directory (the current directory meanwhile)
+    """
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for filename in ASSIGNMENTS[name]["files"]:
+            os.symlink(
+                os.path.join(data_dir, filename), os.path.join(work_dir, filename)
+            )
+
+        # Assignment code reads its data from the current directory.
+        os.chdir(work_dir)
+        try:
+            yield work_dir
+        finally:
+            os.chdir(previous_dir)
+
+
+def run_assignment(name, data_dir, trace_memory):
+    """
+    Measure every question of one assignment (runs inside a worker process).
+
+    Args:
+        name (string): Assignment name in ASSIGNMENTS
+        data_dir (string): Directory of one scale of the generated datasets
+        trace_memory (bool): Measure peak allocations instead of wall times
+
+    Returns:
+        list: One result dict per measured step ("load" and every question)
+    """
+    spec = ASSIGNMENTS[name]
+    code_dir = os.path.join(ROOT, spec["code"])
+    sys.path.insert(0, code_dir)
+    student = importlib.import_module("student")
+
+    results = []
+    if "driver" in spec:
+        main = importlib.import_module(spec["driver"])
+        questions = list(importlib.import_module("grader").find_questions(student))
+        loaded = {}
+
+        def load():
+            loaded["data"] = main.load(questions)
+
+        # One grading run: the data is loaded once, then every question answers it.
+        with private_data(name, data_dir) as work_dir:
+            results.append({"question": "load", **measure(load, trace_memory)})
+            for question in questions:
+                options = {
+                    argument: os.path.join(work_dir, filename)
+                    for argument, filename in spec.get("question_files", {})
+                    .get(question, {})
+                    .items()
+                }
+                step = measure(
+                    lambda: main.answer(loaded["data"], question, **options),
+                    trace_memory,
+                )
+                results.append({"question": question, **step})
+        return results
+
+    # Class based assignments: every question gets a fresh instance (one grading run),
+    # first with cold caches in a private directory, then warm in the same directory.
+    cls = getattr(student, spec["class"])
+    questions = sorted(
+        (attr for attr in vars(cls) if attr[:1] == "Q" and attr[1:].isdigit()),
+        key=lambda question: int(question[1:]),
+    )
+    with private_data(name, data_dir) as work_dir:
+        path = os.path.join(work_dir, spec["files"][0])
+        results.append({"question": "load", **measure(lambda: cls(path), trace_memory)})
+    for question in questions:
+        with private_data(name, data_dir) as work_dir:
+            path = os.path.join(work_dir, spec["files"][0])
+            step = measure(getattr(cls(path), question), trace_memory)
+            warm = measure(getattr(cls(path), question), trace_memory)
+        warm = {f"warm_{key}": value for key, value in warm.items()}
+        results.append({"question": question, **step, **warm})
+    return results
+
+
+def worker(name, data_dir, trace_memory):
+    """
+    Worker process entry point: measure one assignment on private copies of the data.
+
+    Args:
+        name (string): Assignment name in ASSIGNMENTS
+        data_dir (string): Directory of one scale of the generated datasets
+        trace_memory (bool): Measure peak allocations instead of wall times
+    """
+    results = run_assignment(name, data_dir, trace_memory)
+    print(json.dumps(results))
+
+
+def run_worker(name, scale_dir, trace_memory):
+    """
+    Measure one assignment in a separate worker process.
+
+    Args:
+        name (string): Assignment name in ASSIGNMENTS
+        scale_dir (string): Directory of one scale of the generated datasets
+        trace_memory (bool): Measure peak allocations instead of wall times
+
+    Returns:
+        list: Worker results, or None when the worker failed
+    """
+    command = [sys.executable, os.path.abspath(__file__), "worker", name, scale_dir]
+    if trace_memory:
+        command.append("--trace-memory")
+
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(completed.stderr, file=sys.stderr)
+        return None
+
+    # The result is the last stdout line; questions may print on their own.
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(assignments, scales, data_dir, trace_memory=True):
+    """
+    Measure assignments on every scale, each pass in its own process.
+
+    Args:
+        assignments (list): Assignment names
+        scales (list): Dataset scales, as generated by generate.py
+        data_dir (string): Root directory of the generated datasets
+        trace_memory (bool): Also run the peak memory pass
+
+    Returns:
+        dict: Benchmark report (metadata and one record per measured step)
+    """
+    records = []
+    for scale in scales:
+        scale_dir = os.path.join(data_dir, f"x{scale}")
+        for name in assignments:
+            missing = [
+                filename
+                for filename in ASSIGNMENTS[name]["files"]
+                if not os.path.exists(os.path.join(scale_dir, filename))
+            ]
+            if missing:
+                print(
+                    f"skip {name} x{scale}: missing {', '.join(missing)}",
+                    file=sys.stderr,
+                )
+                continue
+
+            timings = run_worker(name, scale_dir, trace_memory=False)
+            memory = (
+                run_worker(name, scale_dir, trace_memory=True) if trace_memory else None
+            )
+            if timings is None:
+                records.append(
+                    {
+                        "assignment": name,
+                        "scale": scale,
+                        "question": "*",
+                        "error": "worker failed",
+                    }
+                )
+                continue
+
+            # Merge the peak memory of each step into its timing record.
+            peaks = {step["question"]: step for step in memory or []}
+            for step in timings:
+                record = {"assignment": name, "scale": scale, **step}
+                for metric in ("peak_bytes", "warm_peak_bytes"):
+                    record[metric] = peaks.get(step["question"], {}).get(metric)
+                records.append(record)
+                print(format_record(record), file=sys.stderr)
+
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "records": records,
+    }
+
+
+def format_record(record):
+    """
+    Format a benchmark record as one line.
+
+    Args:
+        record (dict): Benchmark record
+
+    Returns:
+        string: Human readable line
+    """
+    line = f"{record['assignment']:>15} x{record['scale']:<5} {record['question']:>5}"
+    if record.get("error"):
+        return f"{line}  ERROR {record['error']}"
+    line = f"{line} {record['seconds']:10.4f}s"
+    if record.get("peak_bytes") is not None:
+        line = f"{line} {record['peak_bytes'] / 2**20:10.1f} MiB"
+    if record.get("warm_seconds") is not None:
+        line = f"{line}  warm {record['warm_seconds']:10.4f}s"
+    if record.get("warm_peak_bytes") is not None:
+        line = f"{line} {record['warm_peak_bytes'] / 2**20:10.1f} MiB"
+    return line
+
+
+def compare(baseline, current, threshold):
+    """
+    Flag steps whose time or peak memory grew by more than a threshold ratio.
+
+    Args:
+        baseline (dict): Earlier benchmark report
+        current (dict): Newer benchmark report
+        threshold (float): Allowed growth ratio, e.g. 1.2 for +20%
+
+    Returns:
+        list: Regression lines
+    """
+
+    def key(record):
+        return (record["assignment"], record["scale"], record["question"])
+
+    before = {key(record): record for record in baseline["records"]}
+    regressions = []
+    for record in current["records"]:
+        old = before.get(key(record))
+        if old is None:
+            continue
+
+        name = f"{record['assignment']} x{record['scale']} {record['question']}"
+        if record.get("error") and not old.get("error"):
+            regressions.append(f"{name}: now fails ({record['error']})")
+            continue
+        if record.get("error") or old.get("error"):
+            continue
+
+        for metric in ("seconds", "peak_bytes", "warm_seconds", "warm_peak_bytes"):
+            if old.get(metric) is None or record.get(metric) is None:
+                continue
+
+            # Ignore tiny values, where the ratio is mostly noise.
+            floor = 0.01 if metric.endswith("seconds") else 2**20
+            if old[metric] < floor and record[metric] < floor:
+                continue
+            ratio = record[metric] / max(old[metric], 1e-12)
+            if ratio > threshold:
+                regressions.append(
+                    f"{name}: {metric} {old[metric]:.4g} -> {record[metric]:.4g} ({ratio:.2f}x)"
+                )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every grader question.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="measure the questions (default)")
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    worker_parser = subparsers.add_parser("worker", help=argparse.SUPPRESS)
+
+    for target in (parser, run_parser):
+        target.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+        target.add_argument(
+            "--assignments",
+            nargs="+",
+            default=list(ASSIGNMENTS),
+            choices=list(ASSIGNMENTS),
+        )
+        target.add_argument(
+            "--data", default=DATA_DIR, help="generated datasets directory"
+        )
+        target.add_argument("--output", default="benchmark_results.json")
+        target.add_argument(
+            "--no-memory", action="store_true", help="skip the peak memory pass"
+        )
+
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=1.2)
+
+    worker_parser.add_argument("name")
+    worker_parser.add_argument("data_dir")
+    worker_parser.add_argument("--trace-memory", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        worker(args.name, args.data_dir, args.trace_memory)
+        return
+
+    if args.command == "compare":
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+
+        regressions = compare(baseline, current, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) above {args.threshold:.2f}x")
+        sys.exit(1 if regressions else 0)
+
+    report = run(
+        args.assignments,
+        args.scales,
+        os.path.abspath(args.data),
+        trace_memory=not args.no_memory,
+    )
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(report['records'])} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:
+    pa = None
+
+"""
+    DATASET LOADER:
+    The generic loader of every grader folder. Each folder keeps its dataset
+    schemas in its own dataset.py, which registers them here with register().
+    Read a CSV once, then keep a typed columnar copy (Arrow/Feather) next to it.
+    Later reads memory-map the sidecar instead of parsing the CSV again.
+    The sidecar is only trusted when the size, modification time and content hash
+    of the source CSV still match the fingerprint stored inside it.
+    The size and modification time are checked first, and the content is only hashed
+    again when they changed.
+    Registered datasets are parsed with compact dtypes into one sidecar per source,
+    and every question reads only its columns from that sidecar.
+    A shared handle keeps one parsed (and deduplicated) copy of a dataset per process.
+"""
+
+CACHE_DIR = ".dataset_cache"
+FINGERPRINT_KEY = b"dataset_fingerprint"
+HASH_BLOCK_SIZE = 1 << 20
+
+# Process-wide dataset handles, keyed by real path and schema.
+SHARED_DATASETS = {}
+
+# Registered dataset schemas: dtypes to parse with, and the columns each question
+# reads (None means the question needs every column). Filled by register().
+SCHEMAS = {}
+
+
+def register(schemas):
+    """
+    Register the dataset schemas of a grader folder.
+
+    Args:
+        schemas (dict): Dataset name mapped to its schema
+    """
+    SCHEMAS.update(schemas)
+
+
+def file_stat(path):
+    """
+    Cheap part of the fingerprint of a source file.
+
+    Args:
+        path (string): Source file path
+
+    Returns:
+        dict: Size in bytes and modification time in nanoseconds
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def fingerprint(path):
+    """
+    Compute the fingerprint of a source file.
+
+    Args:
+        path (string): Source file path
+
+    Returns:
+        dict: Size in bytes, modification time in nanoseconds and BLAKE2b content hash
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        while block := file.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+
+    return {**file_stat(path), "hash": digest.hexdigest()}
+
+
+def current_fingerprint(stored, path):
+    """
+    Check a stored fingerprint against its source file. The size and modification
+    time are trusted when they match, so the content is only hashed again when they
+    changed (e.g. a copied or touched file).
+
+    Args:
+        stored (dict): Fingerprint stored with the cached data
+        path (string): Source file path
+
+    Returns:
+        dict: Fingerprint of the source when its content is unchanged
+            (stored itself when nothing changed), otherwise None
+    """
+    if not isinstance(stored, dict):
+        return None
+    if all(stored.get(key) == value for key, value in file_stat(path).items()):
+        return stored
+
+    current = fingerprint(path)
+    if current["hash"] != stored.get("hash"):
+        return None
+    return current
+
+
+def sidecar_path(path, read_options):
+    """
+    Locate the columnar sidecar of a CSV for a given set of read_csv options.
+    Column projections (usecols) are not part of the key: the sidecar always holds
+    every column, and projections are read from it.
+
+    Args:
+        path (string): Source CSV path
+        read_options (dict): Keyword arguments passed to pd.read_csv
+
+    Returns:
+        string: Sidecar file path
+    """
+    read_options = {
+        key: value for key, value in read_options.items() if key != "usecols"
+    }
+    options_key = json.dumps(read_options, sort_keys=True, default=str)
+    options_hash = hashlib.blake2b(options_key.encode(), digest_size=6).hexdigest()
+
+    directory, filename = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR, f"{filename}.{options_hash}.feather")
+
+
+def read_sidecar(path, source_path, columns=None):
+    """
+    Memory-map a sidecar file if its stored fingerprint matches the source.
+
+    Args:
+        path (string): Sidecar file path
+        source_path (string): Source CSV path
+        columns (list): Columns to read (with the index column), every column when None
+
+    Returns:
+        DataFrame: Cached data, or None when the sidecar is missing or stale
+    """
+    if not os.path.exists(path):
+        return None
+
+    # The mapping stays open for as long as the returned columns reference it.
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        metadata = reader.schema.metadata or {}
+        stored = json.loads(metadata.get(FINGERPRINT_KEY, b"null"))
+        current = current_fingerprint(stored, source_path)
+        if current is None:
+            return None
+        table = reader.read_all()
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+    # Same content under a new size / mtime: store the new fingerprint, so the next
+    # read trusts the file again without hashing it.
+    if current != stored:
+        try:
+            write_table(path, table, current)
+        except (OSError, pa.ArrowException):
+            pass
+
+    # Only the projected columns are converted, in file order (like usecols).
+    if columns is not None:
+        table = table.select([name for name in table.column_names if name in columns])
+
+    # Keep one block per column, so numeric columns can stay backed by the mapped file.
+    return table.to_pandas(split_blocks=True)
+
+
+def write_table(path, table, source_fingerprint):
+    """
+    Store an Arrow table as an uncompressed Arrow file together with a fingerprint.
+
+    Args:
+        path (string): Sidecar file path
+        table (Table): Data to store
+        source_fingerprint (dict): Fingerprint of the source CSV
+    """
+    metadata = dict(table.schema.metadata or {})
+    metadata[FINGERPRINT_KEY] = json.dumps(source_fingerprint).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # Write to a temporary file first, so readers never see a half-written sidecar.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(temp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def write_sidecar(path, df, source_fingerprint):
+    """
+    Store a DataFrame as an uncompressed Arrow file together with its fingerprint.
+
+    Args:
+        path (string): Sidecar file path
+        df (DataFrame): Parsed data
+        source_fingerprint (dict): Fingerprint of the source CSV
+    """
+    write_table(path, pa.Table.from_pandas(df), source_fingerprint)
+
+
+def schema_columns(schema, questions=None):
+    """
+    Collect the columns that a set of questions reads from a registered dataset.
+
+    Args:
+        schema (string): Registered dataset name
+        questions (list): Question names, every registered question when None
+
+    Returns:
+        list: Column names in first-use order, or None when every column is needed
+    """
+    question_columns = SCHEMAS[schema]["columns"]
+    if questions is None:
+        questions = list(question_columns)
+
+    columns = []
+    for name in questions:
+        # Unregistered questions conservatively read every column.
+        if question_columns.get(name) is None:
+            return None
+        for col in question_columns[name]:
+            if col not in columns:
+                columns.append(col)
+    return columns
+
+
+def schema_projection(schema, questions=None):
+    """
+    Columns of a registered dataset to load for a set of questions.
+
+    Args:
+        schema (string): Registered dataset name
+        questions (list): Question names, every registered question when None
+
+    Returns:
+        list: Column names (with the index column), or None for every column
+    """
+    entry = SCHEMAS[schema]
+
+    # Some datasets must be loaded in full (e.g. whole-row deduplication).
+    if entry.get("parse_all_columns", False):
+        return None
+
+    columns = schema_columns(schema, questions)
+    if columns is None:
+        return None
+
+    # The index column is always read when the dataset has one.
+    index_column = entry.get("index_column")
+    if index_column is not None and index_column not in columns:
+        columns = [index_column] + columns
+    return columns
+
+
+def schema_parse_options(schema):
+    """
+    Build the pd.read_csv options that parse every column of a registered dataset.
+
+    Args:
+        schema (string): Registered dataset name
+
+    Returns:
+        dict: Keyword arguments for pd.read_csv (dtype, ...)
+    """
+    entry = SCHEMAS[schema]
+    return {**entry.get("read_options", {}), "dtype": entry["dtype"]}
+
+
+def schema_read_options(schema, questions=None):
+    """
+    Build the pd.read_csv options of a registered dataset for a set of questions.
+
+    Args:
+        schema (string): Registered dataset name
+        questions (list): Question names, every registered question when None
+
+    Returns:
+        dict: Keyword arguments for pd.read_csv (usecols, dtype, ...)
+    """
+    options = schema_parse_options(schema)
+    columns = schema_projection(schema, questions)
+    if columns is not None:
+        options["usecols"] = columns
+        options["dtype"] = {
+            col: col_type
+            for col, col_type in options["dtype"].items()
+            if col in columns
+        }
+    return options
+
+
+def load_csv(path, schema=None, questions=None, **read_options):
+    """
+    Load a CSV file through its columnar sidecar cache.
+    The sidecar is parsed once with every column of the file; the columns of the
+    questions (or an explicit usecols) are then projected from the Arrow file, so
+    every projection of a source shares a single sidecar.
+
+    Args:
+        path (string): CSV dataset path
+        schema (string): Registered dataset name used for dtypes and column projection
+        questions (list): Question names the data is loaded for, every question when None
+        **read_options: Keyword arguments passed to pd.read_csv (override the schema)
+
+    Returns:
+        DataFrame: Loaded dataset
+    """
+    # Without pyarrow there is no sidecar, so simply parse the needed columns.
+    if pa is None:
+        if schema is not None:
+            read_options = {**schema_read_options(schema, questions), **read_options}
+        return pd.read_csv(path, **read_options)
+
+    columns = read_options.pop("usecols", None)
+    if schema is not None:
+        read_options = {**schema_parse_options(schema), **read_options}
+        if columns is None:
+            columns = schema_projection(schema, questions)
+    if columns is not None:
+        columns = list(columns)
+
+    cache_path = sidecar_path(path, read_options)
+    df = read_sidecar(cache_path, path, columns)
+    if df is not None:
+        return df
+
+    source_fingerprint = fingerprint(path)
+    df = pd.read_csv(path, **read_options)
+
+    # A read-only data directory or an unsupported column type only costs the cache.
+    try:
+        write_sidecar(cache_path, df, source_fingerprint)
+    except (OSError, pa.ArrowException):
+        pass
+
+    if columns is None:
+        return df
+    return df[[col for col in df.columns if col in columns]]
+
+
+class SharedDataset:
+    def __init__(self, path, schema=None):
+        """
+        Class constructor method.
+
+        Args:
+            path (string): CSV dataset path
+            schema (string): Registered dataset name used for dtypes and column projection
+        """
+        # Initialization attributes
+        self.path = path
+        self.schema = schema
+
+        # Additional attributes
+        self._df = None
+
+    @property
+    def df(self):
+        """
+        The whole dataset, loaded on first use and deduplicated once when its schema asks for it.
+
+        Returns:
+            DataFrame: Loaded dataset (shared, take a shallow copy before modifying it)
+        """
+        if self._df is None:
+            df = load_csv(self.path, schema=self.schema)
+            if self.schema is not None and SCHEMAS[self.schema].get("deduplicate"):
+                df.drop_duplicates(inplace=True)
+            self._df = df
+        return self._df
+
+    @property
+    def n_rows(self):
+        """
+        Number of rows of the (deduplicated) dataset.
+
+        Returns:
+            int: Row count
+        """
+        return len(self.df)
+
+    def frame(self, questions=None):
+        """
+        A copy-on-write view of the dataset with only the columns the questions read.
+
+        Args:
+            questions (list): Question names, every registered question when None
+
+        Returns:
+            DataFrame: Projected shallow copy
+        """
+        columns = None
+        if self.schema is not None:
+            columns = schema_columns(self.schema, questions)
+        if columns is None:
+            return self.df.copy(deep=False)
+        return self.df[columns]
+
+
+def shared(path, schema=None):
+    """
+    Get the process-wide handle of a dataset, so every question of a run reuses
+    one parse (and one deduplication) of the same file.
+
+    Args:
+        path (string): CSV dataset path
+        schema (string): Registered dataset name
+
+    Returns:
+        SharedDataset: Handle shared by every caller with the same path and schema
+    """
+    key = (os.path.realpath(path), schema)
+    if key not in SHARED_DATASETS:
+        SHARED_DATASETS[key] = SharedDataset(path, schema)
+    return SHARED_DATASETS[key]
+
+
+def release(path, schema=None):
+    """
+    Drop the process-wide handle of a dataset, so its frame can be freed once the
+    caller's views of it are gone (e.g. a worker moving on to the next file).
+
+    Args:
+        path (string): CSV dataset path
+        schema (string): Registered dataset name
+    """
+    SHARED_DATASETS.pop((os.path.realpath(path), schema), None)